@@ -0,0 +1,256 @@
+"""Microbenchmarks for the learning-mode analysis and error-explanation code.
+
+Times is_safe_import, advanced_code_analysis, explain_error,
+generate_personalized_feedback and intelligence_router on a generated
+corpus of programs and on real tracebacks, then reports ops/sec and the
+peak memory allocated per call. The ``cached_analysis`` cases time the
+report cache on a miss, on a renamed copy of a cached program and on an
+unchanged rerun.
+
+    python benchmarks/bench_analysis.py                    # run and compare
+    python benchmarks/bench_analysis.py --save-baseline    # record a baseline
+    python benchmarks/bench_analysis.py --only explain_error
+
+If ``benchmarks/baseline.json`` exists, any case that drops more than
+``--tolerance`` below it is reported and the script exits with status 1.
+Baselines are machine-specific and are not committed.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "devetryx_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from core import views  # noqa: E402
+
+# =========================================================
+# CORPUS
+# =========================================================
+
+IMPORTS = [
+    "import math", "import random", "import json", "import re",
+    "import statistics", "import itertools", "import functools",
+    "from datetime import datetime", "from typing import List",
+]
+
+def generate_function(rng, index, depth):
+    lines = [f"def task_{index}(data, limit={rng.randint(3, 50)}):"]
+    lines.append("    total = 0")
+    lines.append("    seen = [x * 2 for x in data if x % 3]")
+    indent = "    "
+
+    for level in range(depth):
+        kind = rng.choice(["for", "if", "while"])
+        if kind == "for":
+            lines.append(f"{indent}for i{level} in range(limit):")
+        elif kind == "if":
+            lines.append(f"{indent}if total > {rng.randint(0, 100)}:")
+        else:
+            lines.append(f"{indent}while total < limit * {level + 1}:")
+        indent += "    "
+        lines.append(f"{indent}total += {rng.randint(1, 9)}")
+
+    lines.append("    unused_value = total * 2")
+    lines.append("    if limit > 1:")
+    lines.append(f"        return task_{index}(seen, limit // 2) + total")
+    lines.append("    return total")
+    lines.append("")
+    return lines
+
+def generate_program(lines, depth=3, imports=5, seed=0):
+    rng = random.Random(seed)
+    program = [rng.choice(IMPORTS) for _ in range(imports)]
+    program.append("")
+
+    index = 0
+    while len(program) < lines:
+        program.extend(generate_function(rng, index, rng.randint(1, depth)))
+        index += 1
+
+    program.append("print(task_0([1, 2, 3, 4, 5]))")
+    return "\n".join(program) + "\n"
+
+def build_corpus():
+    return {
+        "small": generate_program(20),
+        "medium": generate_program(500),
+        "large": generate_program(5000),
+        "deep_nesting": generate_program(400, depth=40),
+        "many_imports": generate_program(300, imports=250),
+    }
+
+FAILING_PROGRAMS = {
+    "NameError": "def area(r):\n    return pi * r * r\nprint(area(3))\n",
+    "ZeroDivisionError": "values = [3, 0]\nprint(10 / values[1])\n",
+    "IndexError": "items = [1, 2, 3]\nfor i in range(5):\n    print(items[i])\n",
+    "TypeError": "age = '3'\nprint(age + 1)\n",
+    "KeyError": "scores = {'ana': 3}\nprint(scores['bob'])\n",
+    "RecursionError": "def down(n):\n    return down(n + 1)\ndown(0)\n",
+    "SyntaxError": "for i in range(3)\n    print(i)\n",
+    "Unknown": "class Oops(Exception):\n    pass\nraise Oops('custom failure')\n",
+}
+
+def collect_tracebacks():
+    # Real stderr from the interpreter, as the executor would capture it
+    tracebacks = {}
+    with tempfile.TemporaryDirectory() as workspace:
+        for name, code in FAILING_PROGRAMS.items():
+            path = os.path.join(workspace, "main.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(code)
+            tracebacks[name] = subprocess.run(
+                [sys.executable, path], capture_output=True, text=True,
+                stdin=subprocess.DEVNULL, cwd=workspace
+            ).stderr
+    return tracebacks
+
+# =========================================================
+# CASES
+# =========================================================
+
+def rename_identifiers(code):
+    # Same shape, different names: what a classmate's submission looks like
+    names = sorted(set(re.findall(r"\b(?:task_\d+|total|seen|limit|data|unused_value)\b", code)))
+    mapping = {name: f"{name}_v2" for name in names}
+    return re.sub(r"\b(?:task_\d+|total|seen|limit|data|unused_value)\b",
+                  lambda m: mapping[m.group(0)], code)
+
+def cold_cached_analysis(code):
+    views.REPORT_CACHE.clear()
+    views.SOURCE_CACHE.clear()
+    return views.cached_analysis(code)
+
+def renamed_cached_analysis(code):
+    # A new source every call, so only the shape cache can hit
+    views.SOURCE_CACHE.clear()
+    return views.cached_analysis(code)
+
+def build_cases(corpus, tracebacks):
+    cases = {}
+    analyses = {name: views.advanced_code_analysis(code) for name, code in corpus.items()}
+    stdout = "result: 42\n" * 200
+
+    for name, code in corpus.items():
+        cases[f"is_safe_import/{name}"] = (views.is_safe_import, (code,))
+        cases[f"advanced_code_analysis/{name}"] = (views.advanced_code_analysis, (code,))
+        cases[f"generate_personalized_feedback/{name}"] = (
+            views.generate_personalized_feedback, (analyses[name], stdout)
+        )
+        cases[f"intelligence_router/mentor/{name}"] = (
+            views.intelligence_router, ("mentor", code, stdout, "")
+        )
+        cases[f"cached_analysis/miss/{name}"] = (cold_cached_analysis, (code,))
+        cases[f"cached_analysis/shape_hit/{name}"] = (
+            renamed_cached_analysis, (rename_identifiers(code),)
+        )
+        cases[f"cached_analysis/rerun/{name}"] = (views.cached_analysis, (code,))
+
+    for name, stderr in tracebacks.items():
+        code = FAILING_PROGRAMS[name]
+        cases[f"explain_error/{name}"] = (views.explain_error, (stderr, code))
+        cases[f"intelligence_router/error/{name}"] = (
+            views.intelligence_router, ("mentor", code, "", stderr)
+        )
+
+    return cases
+
+# =========================================================
+# MEASUREMENT
+# =========================================================
+
+def measure(func, args, min_time):
+    # Calibrate the batch size, then keep the best of five batches
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 5:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(4):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"ops_per_sec": number / best, "peak_kib": peak / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds spent per case (default 0.5)")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed ops/sec drop against the baseline (default 0.2)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    cases = build_cases(build_corpus(), collect_tracebacks())
+    if args.only:
+        cases = {k: v for k, v in cases.items() if args.only in k}
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH) and not args.save_baseline:
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+
+    print(f"{'case':<50}{'ops/sec':>14}{'peak KiB':>11}{'vs base':>10}")
+    for name, (func, call_args) in cases.items():
+        result = measure(func, call_args, args.min_time)
+        results[name] = result
+
+        change = ""
+        if name in baseline:
+            ratio = result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+            change = f"{ratio:.2f}x"
+            if ratio < 1 - args.tolerance:
+                regressions.append(name)
+                change += " !"
+
+        print(f"{name:<50}{result['ops_per_sec']:>14,.0f}"
+              f"{result['peak_kib']:>11.1f}{change:>10}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+
+    print(f"\nReport cache: shapes {views.REPORT_CACHE.stats()}")
+    print(f"              sources {views.SOURCE_CACHE.stats()}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for name in regressions:
+            print(f"  {name}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
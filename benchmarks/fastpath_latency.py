@@ -0,0 +1,83 @@
+"""Compare fast-path latency with the full subprocess sandbox.
+
+Each program runs through ``execute_python`` with the fast path enabled
+and disabled, and the median wall-clock latency of each is reported. The
+first fast-path call, which starts the worker pool, is reported separately.
+
+    python benchmarks/fastpath_latency.py [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "devetryx_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from core import views  # noqa: E402
+
+CORPUS = {
+    "hello": ('print("Hello, Devetryx!")\n', ""),
+    "input": ('name = input("Name: ")\nprint("Hi", name)\n', "Ada"),
+    "loop_sum": (
+        "total = 0\n"
+        "for i in range(20000):\n"
+        "    total += i * i\n"
+        "print(total)\n",
+        ""
+    ),
+    "class": (
+        "class Stack:\n"
+        "    def __init__(self):\n"
+        "        self.items = []\n"
+        "    def push(self, x):\n"
+        "        self.items.append(x)\n"
+        "s = Stack()\n"
+        "for i in range(10):\n"
+        "    s.push(i)\n"
+        "print(len(s.items))\n",
+        ""
+    ),
+    "error": ("values = [3, 0]\nprint(10 / values[1])\n", ""),
+    "with_import": ("import math\nprint(math.pi)\n", ""),
+}
+
+def time_call(code, user_input, fast_path):
+    files = {"main.py": code}
+    start = time.perf_counter()
+    views.execute_python(files, "main.py", user_input, fast_path=fast_path)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if not views.FAST_PATH_ENABLED:
+        sys.exit("The fast path is only enabled on Linux.")
+
+    warmup = time_call(*CORPUS["hello"], fast_path=True)
+    print(f"pool start-up (first call): {warmup:.1f} ms\n")
+
+    print(f"{'program':<14}{'eligible':>10}{'fast ms':>10}{'sandbox ms':>12}{'speedup':>10}")
+    for name, (code, user_input) in CORPUS.items():
+        eligible = views.is_fast_path_eligible({"main.py": code}, "main.py")
+        fast = statistics.median(
+            time_call(code, user_input, True) for _ in range(args.repeat)
+        )
+        sandbox = statistics.median(
+            time_call(code, user_input, False) for _ in range(args.repeat)
+        )
+        print(f"{name:<14}{'yes' if eligible else 'no':>10}{fast:>10.1f}"
+              f"{sandbox:>12.1f}{sandbox / fast:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
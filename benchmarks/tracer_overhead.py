@@ -0,0 +1,97 @@
+"""Measure the overhead of trace mode on a small corpus of student-style programs.
+
+Each program is run as a plain ``python main.py`` child and then through
+``core/tracer.py`` with the default limits and with the limits lifted, and
+the wall-clock times are compared.
+
+    python benchmarks/tracer_overhead.py [--python /path/to/python] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACER_SCRIPT = os.path.join(ROOT, "core", "tracer.py")
+
+CORPUS = {
+    "hello": 'print("Hello, Devetryx!")\n',
+    "loop_sum": (
+        "total = 0\n"
+        "for i in range(200000):\n"
+        "    total += i * i\n"
+        "print(total)\n"
+    ),
+    "recursion": (
+        "def fib(n):\n"
+        "    return n if n < 2 else fib(n - 1) + fib(n - 2)\n"
+        "print(fib(22))\n"
+    ),
+    "nested_loops": (
+        "grid = [[0] * 120 for _ in range(120)]\n"
+        "for r in range(120):\n"
+        "    for c in range(120):\n"
+        "        grid[r][c] = r * c % 7\n"
+        "print(sum(map(sum, grid)))\n"
+    ),
+    "stdlib_heavy": (
+        "import json, re, statistics\n"
+        "data = [{'id': i, 'name': f'user{i}'} for i in range(20000)]\n"
+        "text = json.dumps(data)\n"
+        "ids = [int(m) for m in re.findall(r'\"id\": (\\d+)', text)]\n"
+        "print(statistics.mean(ids))\n"
+    ),
+}
+
+# Effectively unbounded, to show what the caps are saving
+UNCAPPED = ["10000000", str(1 << 40), "1"]
+
+def timed_run(command, cwd, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, capture_output=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--python", default=sys.executable)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"interpreter: {args.python}")
+    print(f"{'program':<14}{'plain ms':>10}{'traced ms':>11}{'x':>7}"
+          f"{'uncapped ms':>13}{'x':>7}{'steps':>8}  engine")
+
+    with tempfile.TemporaryDirectory() as workspace:
+        trace_path = os.path.join(workspace, "..trace.json")
+
+        for name, code in CORPUS.items():
+            main_path = os.path.join(workspace, f"{name}.py")
+            with open(main_path, "w", encoding="utf-8") as f:
+                f.write(code)
+
+            plain = timed_run([args.python, main_path], workspace, args.repeat)
+            traced = timed_run(
+                [args.python, TRACER_SCRIPT, trace_path, main_path],
+                workspace, args.repeat
+            )
+            with open(trace_path, encoding="utf-8") as f:
+                trace = json.load(f)
+            uncapped = timed_run(
+                [args.python, TRACER_SCRIPT, trace_path, main_path, *UNCAPPED],
+                workspace, args.repeat
+            )
+
+            print(f"{name:<14}{plain * 1000:>10.1f}{traced * 1000:>11.1f}"
+                  f"{traced / plain:>7.2f}{uncapped * 1000:>13.1f}"
+                  f"{uncapped / plain:>7.2f}{len(trace['steps']):>8}  {trace['engine']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,27 @@
 from django.contrib import admin
-from .models import ContactMessage
+from .models import ContactMessage, LevelTransition, SkillProfile, SkillRun
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'created_at')
     readonly_fields = ('created_at',)
     search_fields = ('name', 'email', 'message')
+
+@admin.register(SkillRun)
+class SkillRunAdmin(admin.ModelAdmin):
+    list_display = ('learner_key', 'mode', 'score', 'level', 'created_at')
+    readonly_fields = ('created_at',)
+    list_filter = ('mode', 'level')
+    search_fields = ('learner_key',)
+
+@admin.register(SkillProfile)
+class SkillProfileAdmin(admin.ModelAdmin):
+    list_display = ('learner_key', 'runs', 'level', 'last_score', 'best_score', 'updated_at')
+    readonly_fields = ('updated_at',)
+    search_fields = ('learner_key',)
+
+@admin.register(LevelTransition)
+class LevelTransitionAdmin(admin.ModelAdmin):
+    list_display = ('learner_key', 'from_level', 'to_level', 'created_at')
+    readonly_fields = ('created_at',)
+    search_fields = ('learner_key',)
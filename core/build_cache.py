@@ -0,0 +1,85 @@
+"""On-disk LRU cache for compiled build artifacts.
+
+Each artifact is a single file named after its cache key. A hit refreshes
+the file's mtime. When the cache grows past its entry or size limit, the
+least recently used files are deleted. Writes go through a temporary file
+and ``os.replace``, so concurrent requests never see a partial binary.
+
+Cached files get executed, so the root must be private: it is created
+with mode 0700 and refused if it is a symlink, owned by another user or
+open to group/others.
+"""
+
+import os
+import shutil
+import stat
+import uuid
+
+class BuildCache:
+
+    def __init__(self, root, max_entries=200, max_bytes=200 * 1024 * 1024):
+        self.root = os.fspath(root)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._checked = False
+
+    def _path(self, key: str) -> str:
+        self._ensure_root()
+        return os.path.join(self.root, key)
+
+    def _ensure_root(self):
+        if self._checked:
+            return
+
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        info = os.lstat(self.root)
+
+        if not stat.S_ISDIR(info.st_mode):
+            raise PermissionError(f"Cache root is not a directory: {self.root}")
+        if hasattr(os, "geteuid"):
+            if info.st_uid != os.geteuid():
+                raise PermissionError(f"Cache root is owned by another user: {self.root}")
+            if info.st_mode & 0o077:
+                os.chmod(self.root, 0o700)
+
+        self._checked = True
+
+    def fetch(self, key: str, dest: str) -> bool:
+        """Copy the artifact for ``key`` to ``dest``; False on a miss."""
+        path = self._path(key)
+        try:
+            shutil.copy2(path, dest)
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key: str, artifact: str):
+        self._ensure_root()
+
+        # Stage inside the cache dir so the final rename is atomic
+        staging = os.path.join(self.root, f".{uuid.uuid4().hex}")
+        shutil.copy2(artifact, staging)
+        os.replace(staging, self._path(key))
+
+        self.evict()
+
+    def evict(self):
+        self._ensure_root()
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,281 @@
+"""Fast path for trivial, import-free snippets.
+
+Most beginner programs finish in microseconds but still pay for a fresh
+interpreter in ``execute_python``. Snippets that pass
+``is_fast_path_eligible`` (views.py) run through a pool of pre-started
+worker processes instead. Each worker forks a fresh child per job, so
+nothing a job changes outlives it. The child gets its own CPU limit, a
+restricted builtins table and a line-event budget. Whenever anything
+looks off (budget exceeded, slow answer, dead worker), the caller gets
+``None`` and falls back to the full subprocess sandbox.
+
+Run as a script, this file is the worker: one JSON job per stdin line,
+one JSON result per stdout line. The worker side must only use the stdlib
+and only runs on Linux.
+"""
+
+import builtins
+import io
+import json
+import linecache
+import os
+import math
+import queue
+import resource
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+# Builtins available to fast-path snippets. Anything else (open, eval,
+# getattr, vars, __import__, ...) makes the snippet ineligible.
+FAST_PATH_BUILTINS = frozenset({
+    "__build_class__",
+    "abs", "all", "any", "bin", "bool", "bytes", "callable", "chr",
+    "classmethod", "complex", "dict", "divmod", "enumerate", "filter",
+    "float", "format", "frozenset", "hash", "hex", "input", "int",
+    "isinstance", "issubclass", "iter", "len", "list", "map", "max",
+    "min", "next", "oct", "ord", "pow", "print", "property", "range",
+    "repr", "reversed", "round", "set", "slice", "sorted", "staticmethod",
+    "str", "sum", "super", "tuple", "type", "zip",
+    "True", "False", "None",
+    "ArithmeticError", "AssertionError", "AttributeError", "EOFError",
+    "Exception", "IndexError", "KeyError", "LookupError", "NameError",
+    "NotImplementedError", "OverflowError", "RecursionError",
+    "RuntimeError", "StopIteration", "TypeError", "ValueError",
+    "ZeroDivisionError",
+})
+
+# =========================================================
+# WORKER
+# =========================================================
+
+class BudgetExceeded(BaseException):
+    pass
+
+class LineBudget:
+
+    def __init__(self, filename, max_lines, deadline):
+        self.filename = filename
+        self.remaining = max_lines
+        self.deadline = deadline
+        self.exceeded = False
+
+    def global_trace(self, frame, event, arg):
+        if frame.f_code.co_filename != self.filename:
+            return None
+        return self.local_trace
+
+    def local_trace(self, frame, event, arg):
+        if event == "line":
+            self.remaining -= 1
+            if self.remaining < 0 or (
+                not self.remaining % 1000 and time.perf_counter() > self.deadline
+            ):
+                self.exceeded = True
+            if self.exceeded:
+                raise BudgetExceeded
+        return self.local_trace
+
+class CappedOutput(io.StringIO):
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def write(self, text):
+        if self.tell() < self.limit:
+            super().write(text[:self.limit - self.tell()])
+        return len(text)
+
+def format_user_traceback(exc, filename):
+    # Show only the user's frames, like a plain `python main.py`
+    report = traceback.TracebackException.from_exception(exc)
+    pending = [report]
+
+    while pending:
+        current = pending.pop()
+        current.stack = traceback.StackSummary.from_list(
+            [frame for frame in current.stack if frame.filename == filename]
+        )
+        pending.extend(e for e in (current.__cause__, current.__context__) if e)
+
+    return "".join(report.format())
+
+def run_job(job, channel_stdout):
+    filename = job["filename"]
+    output = CappedOutput(job["max_output"])
+    lines = iter(job["input"])
+
+    def fast_input(prompt=""):
+        output.write(str(prompt))
+        try:
+            return next(lines)
+        except StopIteration:
+            raise EOFError("EOF when reading a line") from None
+
+    restricted = {name: getattr(builtins, name) for name in FAST_PATH_BUILTINS}
+    restricted["input"] = fast_input
+    namespace = {"__name__": "__main__", "__builtins__": restricted}
+
+    source = job["code"]
+    code = compile(source, filename, "exec")
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+    budget = LineBudget(filename, job["max_lines"], time.perf_counter() + job["max_seconds"])
+    stderr = ""
+
+    sys.stdout = output
+    sys.settrace(budget.global_trace)
+    try:
+        exec(code, namespace)
+    except BudgetExceeded:
+        pass
+    except SystemExit as e:
+        if e.code is not None and not isinstance(e.code, int):
+            stderr = f"{e.code}\n"
+    except BaseException as e:
+        stderr = format_user_traceback(e, filename)
+    finally:
+        sys.settrace(None)
+        sys.stdout = channel_stdout
+        namespace.clear()
+        linecache.cache.pop(filename, None)
+
+    if budget.exceeded:
+        return {"status": "budget"}
+    return {"status": "ok", "stdout": output.getvalue(), "stderr": stderr}
+
+def run_child(job, channel, write_fd):
+    # Runs in the forked child; never returns
+    try:
+        cpu = math.ceil(job["max_seconds"])
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+        result = run_job(job, channel)
+    except BaseException as e:
+        result = {"status": "failed", "error": str(e)}
+
+    with os.fdopen(write_fd, "w") as pipe:
+        pipe.write(json.dumps(result))
+    os._exit(0)
+
+def run_isolated(job, channel):
+    """Run ``job`` in a forked child and return its result."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        run_child(job, channel, write_fd)
+
+    os.close(write_fd)
+    deadline = time.monotonic() + job["max_seconds"] + 0.5
+    chunks = []
+
+    with os.fdopen(read_fd, "rb") as pipe:
+        while True:
+            remaining = deadline - time.monotonic()
+            ready, _, _ = select.select([pipe], [], [], max(remaining, 0))
+            if not ready:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                return {"status": "timeout"}
+            chunk = os.read(pipe.fileno(), 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    os.waitpid(pid, 0)
+    if not chunks:
+        return {"status": "failed", "error": "child exited without a result"}
+    return json.loads(b"".join(chunks))
+
+def serve():
+    # The protocol owns the real stdout; user prints go to CappedOutput
+    channel = sys.stdout
+    for line in sys.stdin:
+        try:
+            result = run_isolated(json.loads(line), channel)
+        except Exception as e:
+            result = {"status": "failed", "error": str(e)}
+        channel.write(json.dumps(result) + "\n")
+        channel.flush()
+
+# =========================================================
+# POOL
+# =========================================================
+
+class FastPathPool:
+    """Pre-started workers; ``run`` returns None whenever it cannot help."""
+
+    def __init__(self, size, preexec_fn=None, timeout=2.0, jobs_per_worker=100):
+        self.size = size
+        self.preexec_fn = preexec_fn
+        self.timeout = timeout
+        self.jobs_per_worker = jobs_per_worker
+
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _spawn(self):
+        process = subprocess.Popen(
+            [sys.executable, "-I", os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            preexec_fn=self.preexec_fn
+        )
+        return [process, 0]
+
+    def _replace(self):
+        # Start the replacement off the request path
+        threading.Thread(
+            target=lambda: self._idle.put(self._spawn()), daemon=True
+        ).start()
+
+    def _ensure_started(self):
+        with self._lock:
+            if not self._started:
+                for _ in range(self.size):
+                    self._idle.put(self._spawn())
+                self._started = True
+
+    def run(self, job: dict):
+        self._ensure_started()
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            return None
+
+        process = worker[0]
+        try:
+            process.stdin.write(json.dumps(job) + "\n")
+            process.stdin.flush()
+
+            ready, _, _ = select.select([process.stdout], [], [], self.timeout)
+            if not ready:
+                raise TimeoutError
+            result = json.loads(process.stdout.readline())
+        except Exception:
+            process.kill()
+            process.wait()
+            self._replace()
+            return None
+
+        worker[1] += 1
+        if worker[1] >= self.jobs_per_worker:
+            process.stdin.close()
+            process.wait()
+            self._replace()
+        else:
+            self._idle.put(worker)
+
+        return result if result.get("status") == "ok" else None
+
+if __name__ == "__main__":
+    serve()
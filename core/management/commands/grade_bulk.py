@@ -0,0 +1,305 @@
+"""Grade a whole class's submissions offline.
+
+Submissions come from a directory or a JSONL file:
+
+* directory: every ``*.py`` file is a single-file submission, and every
+  subdirectory with a ``main.py`` is a multi-file submission;
+* JSONL: one ``{"id": ..., "files": {...}, "main_file": ...}`` object per
+  line (``{"id": ..., "code": "..."}`` is accepted for single files).
+
+Test-case input comes from ``user_input`` or from a ``stdin_file`` path
+(relative to the JSONL file). ``--stdin`` sets one file for every
+submission. Input files are handed to the child as its stdin fd, not
+read into memory.
+
+Each submission goes through the same security check, analysis and skill
+scoring as learning mode and, with ``--execute``, the sandboxed executor.
+Each worker shares analyses between same-shaped submissions through the
+learning-mode report cache.
+Results are written to JSONL or CSV as soon as they finish, so memory use
+stays flat. The output file is also the checkpoint: ``--resume`` skips
+every id that is already in it.
+"""
+
+import ast
+import csv
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from core import views
+from core.progress import skill_features
+
+CSV_FIELDS = [
+    "id", "status", "score", "level",
+    "functions", "loops", "nested_loop_depth", "conditions", "recursion",
+    "list_comp", "cyclomatic_complexity", "unused_variables",
+    "error", "stdin_bytes", "seconds",
+]
+
+MAX_STORED_OUTPUT = 1000
+PROGRESS_EVERY = 500
+
+# =========================================================
+# SUBMISSIONS
+# =========================================================
+
+def iter_directory(root):
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        if os.path.isfile(path) and name.endswith(".py"):
+            yield {"id": name, "path": path}
+        elif os.path.isfile(os.path.join(path, "main.py")):
+            yield {"id": name, "path": path}
+
+def iter_jsonl(path):
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "code" in record:
+                record["files"] = {"main.py": record.pop("code")}
+                record["main_file"] = "main.py"
+            record["id"] = str(record.get("id", number))
+            if record.get("stdin_file"):
+                record["stdin_file"] = os.path.join(base, record["stdin_file"])
+            yield record
+
+def load_files(submission):
+    # Directory submissions are read in the worker, not the parent
+    path = submission.get("path")
+    if path is None:
+        return submission["files"], submission["main_file"]
+
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            return {"main.py": f.read()}, "main.py"
+
+    files = {}
+    for name in sorted(os.listdir(path)):
+        if name.endswith(".py"):
+            with open(os.path.join(path, name), encoding="utf-8") as f:
+                files[name] = f.read()
+    return files, "main.py"
+
+# =========================================================
+# WORKER
+# =========================================================
+
+def find_syntax_error(files, main_file):
+    # advanced_code_analysis swallows syntax errors; report them instead
+    for name in [main_file, *sorted(set(files) - {main_file})]:
+        if not name.endswith(".py"):
+            continue
+        try:
+            ast.parse(files[name])
+        except SyntaxError as e:
+            return f"SyntaxError: {e.msg} ({name}, line {e.lineno})"
+    return None
+
+def run_submission(submission, files, main_file, result):
+    stdin_path = submission.get("stdin_file")
+    if not stdin_path:
+        user_input = submission.get("user_input", "")
+        result["stdin_bytes"] = len(user_input.encode("utf-8"))
+        return views.execute_python(files, main_file, user_input)
+
+    with open(stdin_path, "rb") as stdin:
+        size = os.fstat(stdin.fileno()).st_size
+        if size > views.MAX_STDIN_BYTES:
+            raise ValueError(f"stdin file is larger than {views.format_bytes(views.MAX_STDIN_BYTES)}")
+        result["stdin_bytes"] = size
+        return views.execute_python(files, main_file, stdin)
+
+def grade_submission(submission, execute):
+    started = time.perf_counter()
+    result = {"id": submission["id"]}
+
+    try:
+        files, main_file = load_files(submission)
+
+        if main_file not in files:
+            result.update(status="invalid", error="Main file missing")
+        elif not all(views.is_safe_import(code, views.local_modules(files))
+                     for code in files.values()):
+            result.update(status="unsafe")
+        elif (syntax_error := find_syntax_error(files, main_file)):
+            result.update(status="syntax_error", error=syntax_error)
+        else:
+            hits = views.REPORT_CACHE.hits
+            analysis, _ = views.cached_analysis(files[main_file])
+            score = views.calculate_skill_score(analysis)
+            result.update(
+                status="ok",
+                score=score,
+                level=views.detect_level(score),
+                cache_hit=views.REPORT_CACHE.hits > hits,
+                **skill_features(analysis),
+            )
+
+            if execute:
+                run = run_submission(submission, files, main_file, result)
+                result["stdout"] = run["stdout"][:MAX_STORED_OUTPUT]
+                if run["stderr"]:
+                    result["status"] = "runtime_error"
+                    result["error"] = run["stderr"].strip().rsplit("\n", 1)[-1]
+
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+# =========================================================
+# OUTPUT
+# =========================================================
+
+def read_checkpoint(path, fmt):
+    """Return the ids already graded in ``path``, dropping a torn last line."""
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+
+    lines = data[:end].decode("utf-8").splitlines()
+    if fmt == "csv":
+        return {row["id"] for row in csv.DictReader(lines)}
+    return {json.loads(line)["id"] for line in lines if line.strip()}
+
+class ResultWriter:
+
+    def __init__(self, path, fmt, append):
+        new_file = not (append and os.path.exists(path) and os.path.getsize(path))
+        self.file = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        self.fmt = fmt
+
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.file, CSV_FIELDS, extrasaction="ignore")
+            if new_file:
+                self.csv.writeheader()
+
+    def write(self, result):
+        if self.fmt == "csv":
+            self.csv.writerow(result)
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+# =========================================================
+# COMMAND
+# =========================================================
+
+class Command(BaseCommand):
+    help = "Analyze and score a directory or JSONL file of submissions in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="submissions directory or .jsonl file")
+        parser.add_argument("output", help="results file (.jsonl or .csv)")
+        parser.add_argument("--execute", action="store_true",
+                            help="also run each submission in the sandbox")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--resume", action="store_true",
+                            help="skip submissions already present in the output")
+        parser.add_argument("--stdin", metavar="FILE",
+                            help="test-case input for submissions without their own")
+
+    def handle(self, *args, **options):
+        source, output = options["source"], options["output"]
+        fmt = "csv" if output.endswith(".csv") else "jsonl"
+        workers = max(1, options["workers"])
+
+        if os.path.isdir(source):
+            submissions = iter_directory(source)
+        elif os.path.isfile(source):
+            submissions = iter_jsonl(source)
+        else:
+            raise CommandError(f"Submission source not found: {source}")
+
+        stdin_path = options["stdin"] and os.path.abspath(options["stdin"])
+        if stdin_path and not os.path.isfile(stdin_path):
+            raise CommandError(f"stdin file not found: {stdin_path}")
+
+        done = read_checkpoint(output, fmt) if options["resume"] else set()
+        writer = ResultWriter(output, fmt, append=options["resume"])
+
+        statuses = Counter()
+        levels = Counter()
+        totals = Counter()
+        skipped = 0
+        started = time.perf_counter()
+
+        # Keep only a few submissions in flight so memory stays flat
+        window = workers * 4
+        pending = set()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            try:
+                for submission in submissions:
+                    if submission["id"] in done:
+                        skipped += 1
+                        continue
+                    if stdin_path and "user_input" not in submission:
+                        submission.setdefault("stdin_file", stdin_path)
+
+                    pending.add(pool.submit(grade_submission, submission, options["execute"]))
+                    if len(pending) >= window:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        self._record(finished, writer, statuses, levels, totals, started)
+
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._record(finished, writer, statuses, levels, totals, started)
+            finally:
+                writer.close()
+
+        elapsed = time.perf_counter() - started
+        graded = sum(statuses.values())
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Graded {graded} submission(s) in {elapsed:.1f}s "
+            f"({graded / elapsed if elapsed else 0:.1f}/s, {workers} worker(s))"
+        ))
+        if skipped:
+            self.stdout.write(f"Skipped {skipped} already graded submission(s)")
+        if statuses:
+            self.stdout.write("Status: " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items())))
+        if levels:
+            self.stdout.write("Levels: " + ", ".join(f"{k}={v}" for k, v in sorted(levels.items())))
+        if totals["analysed"]:
+            self.stdout.write(
+                f"Report cache: {totals['cache_hits']}/{totals['analysed']} hits "
+                f"({totals['cache_hits'] / totals['analysed']:.0%})"
+            )
+        if totals["stdin_bytes"]:
+            self.stdout.write(f"Stdin fed: {views.format_bytes(totals['stdin_bytes'])}")
+
+    def _record(self, finished, writer, statuses, levels, totals, started):
+        for future in finished:
+            result = future.result()
+            writer.write(result)
+            statuses[result["status"]] += 1
+            if "level" in result:
+                levels[result["level"]] += 1
+            totals["stdin_bytes"] += result.get("stdin_bytes", 0)
+            if "cache_hit" in result:
+                totals["analysed"] += 1
+                totals["cache_hits"] += result["cache_hit"]
+
+            graded = sum(statuses.values())
+            if graded % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - started
+                self.stderr.write(f"{graded} graded ({graded / elapsed:.1f}/s)")
@@ -0,0 +1,248 @@
+"""Memory profiler for memory mode.
+
+Loaded by the prelude that ``execute_python`` prepends to the user's main
+file (see ``INJECTED_LINES`` in views.py), so it runs inside the sandboxed
+child. ``tracemalloc`` is started before the first user line. While the
+program runs, allocations are sampled and grouped by the line that made
+them; allocations made inside library code are not attributed. At exit a
+JSON report is written to ``out_path``.
+
+Tracing every allocation makes a program several times slower, and
+grouping needs a copy of every trace. So the child runs with headroom
+above the normal limits (see ``limit_profiled_resources`` in views.py),
+and this module enforces the user's memory budget itself: ``MemoryError``
+is raised in the program once traced memory passes ``memory_budget``
+bytes. When the soft CPU limit is reached, the report is written before
+the process dies.
+
+This module is imported by the child interpreter and must only use the stdlib.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from operator import itemgetter
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+
+TRACE_FRAMES = 1               # deeper stacks slow every traced allocation
+SNAPSHOT_INTERVAL = 0.2        # seconds between growth samples
+BUDGET_INTERVAL = 0.01         # seconds between budget checks
+MAX_SNAPSHOTS = 10
+TOP_LINES = 10
+TOP_GROWTH = 3
+
+_size = itemgetter(1)
+_frames = itemgetter(2)
+
+# =========================================================
+# WATCHER
+# =========================================================
+
+class MemoryWatch:
+
+    def __init__(self, out_path, main_file, injected_lines, memory_budget):
+        self.out_path = out_path
+        self.main_file = os.path.abspath(main_file)
+        self.workspace = os.path.join(os.path.dirname(self.main_file), "")
+        self.injected_lines = injected_lines
+        self.memory_budget = memory_budget
+
+        self.started = time.perf_counter()
+        self.timeline = []
+        self.peak = 0
+        self.error = None
+        self.skipped = 0               # samples dropped for lack of headroom
+        self._done = threading.Event()
+        self._reported = threading.Lock()
+        self._sampler = threading.Thread(target=self.sample, daemon=True)
+
+    def location(self, frames):
+        # Most recent frame that belongs to the user's files
+        for filename, line in frames:
+            if not filename.startswith(self.workspace):
+                continue
+            if filename == self.main_file:
+                line -= self.injected_lines
+                if line < 1:
+                    return None     # the prelude itself
+            return os.path.relpath(filename, self.workspace), line
+        return None
+
+    def by_line(self):
+        # Read the peak first and reset it afterwards, so our own
+        # bookkeeping never shows up as the program's peak.
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+
+        # Raw (domain, size, frames, nframes) tuples, most recent frame
+        # first. Every allocation made here is traced too, so group by
+        # sorting in place instead of building per-trace objects the way
+        # Snapshot.statistics() does; that is ~50x faster on large heaps.
+        totals = {}
+        traces = None
+        try:
+            traces = tracemalloc._get_traces()
+            traces.sort(key=_frames)
+
+            for frames, group in itertools.groupby(traces, key=_frames):
+                where = self.location(frames)
+                if where is None:
+                    continue
+                group = list(group)
+                entry = totals.setdefault(where, [0, 0])
+                entry[0] += sum(map(_size, group))
+                entry[1] += len(group)
+        except MemoryError:
+            # Out of headroom: drop this sample, the peak is already kept
+            self.skipped += 1
+            return None
+        finally:
+            del traces
+            tracemalloc.reset_peak()
+        return totals
+
+    def sample(self):
+        wait = SNAPSHOT_INTERVAL
+        next_sample = time.perf_counter() + wait
+
+        while not self._done.wait(BUDGET_INTERVAL):
+            self.check_budget()
+            if len(self.timeline) >= MAX_SNAPSHOTS or time.perf_counter() < next_sample:
+                continue
+
+            started = time.perf_counter()
+            totals = self.by_line()
+            if totals is not None:
+                self.timeline.append((self.elapsed(), totals))
+
+            # Keep sampling under ~20% of the run on large heaps
+            cost = time.perf_counter() - started
+            wait = max(SNAPSHOT_INTERVAL, 4 * cost)
+            next_sample = time.perf_counter() + wait
+
+    def check_budget(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        if current > self.memory_budget:
+            # over_budget raises it in the main thread, at the running user line
+            signal.raise_signal(signal.SIGUSR1)
+
+    @staticmethod
+    def over_budget(signum, frame):
+        raise MemoryError()
+
+    def out_of_cpu(self, signum, frame):
+        # Soft RLIMIT_CPU: write the report, then die like a normal run
+        self.error = "CPU time limit exceeded"
+        self.write_report()
+        signal.signal(signum, signal.SIG_DFL)
+        signal.raise_signal(signum)
+
+    def elapsed(self) -> float:
+        return round(time.perf_counter() - self.started, 3)
+
+    def excepthook(self, exc_type, exc, tb):
+        self.error = exc_type.__name__
+
+        # Drop our own frames (the MemoryError raised by over_budget), so
+        # the last traceback line is still the user's
+        report = traceback.TracebackException(exc_type, exc, tb)
+        pending = [report]
+        while pending:
+            current = pending.pop()
+            current.stack = traceback.StackSummary.from_list(
+                [frame for frame in current.stack if frame.filename != __file__]
+            )
+            pending.extend(e for e in (current.__cause__, current.__context__) if e)
+        sys.stderr.write("".join(report.format()))
+
+    # ---------------- report ----------------
+
+    def growth(self):
+        intervals = []
+        previous_t, previous = 0.0, {}
+
+        for t, totals in self.timeline:
+            deltas = [
+                (size - previous.get(where, (0, 0))[0], where)
+                for where, (size, _) in totals.items()
+            ]
+            deltas = sorted((d for d in deltas if d[0] > 0), reverse=True)[:TOP_GROWTH]
+            if deltas:
+                intervals.append({
+                    "from": previous_t,
+                    "to": t,
+                    "lines": [
+                        {"file": f, "line": line, "delta": d}
+                        for d, (f, line) in deltas
+                    ],
+                })
+            previous_t, previous = t, totals
+
+        return intervals
+
+    def finish(self):
+        self._done.set()
+        self._sampler.join()
+
+        final = self.by_line()
+        if final is not None:
+            self.timeline.append((self.elapsed(), final))
+        self.write_report()
+        tracemalloc.stop()
+
+    def write_report(self):
+        # Once only: a CPU kill may arrive while exit is already reporting
+        if not self._reported.acquire(blocking=False):
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "peak": max(self.peak, peak),
+            "current": current,
+            "error": self.error,
+            "skipped_samples": self.skipped,
+            "top_lines": [],
+            "growth": [],
+        }
+        try:
+            if self.timeline:
+                # Report the sites from the fullest sample, not only what survives to exit
+                _, fullest = max(
+                    self.timeline,
+                    key=lambda item: sum(size for size, _ in item[1].values())
+                )
+                top = sorted(fullest.items(), key=lambda item: item[1][0], reverse=True)[:TOP_LINES]
+                report["top_lines"] = [
+                    {"file": f, "line": line, "size": size, "count": count}
+                    for (f, line), (size, count) in top
+                ]
+                report["growth"] = self.growth()
+        except MemoryError:
+            pass            # peak alone is still worth reporting
+
+        with open(self.out_path, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+
+# =========================================================
+# ENTRY POINT
+# =========================================================
+
+def start(out_path, main_file, injected_lines, memory_budget):
+    watch = MemoryWatch(out_path, main_file, injected_lines, memory_budget)
+
+    tracemalloc.start(TRACE_FRAMES)
+    sys.excepthook = watch.excepthook
+    signal.signal(signal.SIGUSR1, watch.over_budget)
+    signal.signal(signal.SIGXCPU, watch.out_of_cpu)
+    atexit.register(watch.finish)
+    watch._sampler.start()
@@ -0,0 +1,93 @@
+# Generated by Django 5.2.9 on 2026-10-19 02:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LevelTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(db_index=True, max_length=64)),
+                ('from_level', models.CharField(blank=True, max_length=20)),
+                ('to_level', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('score_total', models.PositiveIntegerField(default=0)),
+                ('score_min', models.PositiveSmallIntegerField(default=100)),
+                ('score_max', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'unique_together': {('learner_key', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64, unique=True)),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('score_total', models.PositiveIntegerField(default=0)),
+                ('best_score', models.PositiveSmallIntegerField(default=0)),
+                ('last_score', models.PositiveSmallIntegerField(default=0)),
+                ('level', models.CharField(blank=True, max_length=20)),
+                ('metric_averages', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SkillRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(db_index=True, max_length=64)),
+                ('mode', models.CharField(max_length=20)),
+                ('score', models.PositiveSmallIntegerField()),
+                ('level', models.CharField(max_length=20)),
+                ('features', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillWeeklyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64)),
+                ('week_start', models.DateField()),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('score_total', models.PositiveIntegerField(default=0)),
+                ('score_min', models.PositiveSmallIntegerField(default=100)),
+                ('score_max', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-week_start'],
+                'unique_together': {('learner_key', 'week_start')},
+            },
+        ),
+        migrations.AddField(
+            model_name='leveltransition',
+            name='run',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='core.skillrun'),
+        ),
+    ]
@@ -9,3 +9,95 @@ class ContactMessage(models.Model):
 
     def __str__(self):
         return f"{self.name} <{self.email}>"
+
+
+class SkillRun(models.Model):
+    """One learning-mode run: the skill score and the analysis features behind it."""
+    learner_key = models.CharField(max_length=64, db_index=True)
+    mode = models.CharField(max_length=20)
+    score = models.PositiveSmallIntegerField()
+    level = models.CharField(max_length=20)
+    features = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.learner_key} scored {self.score} ({self.level})"
+
+
+class SkillDailyRollup(models.Model):
+    """Per-learner score aggregates for one calendar day."""
+    learner_key = models.CharField(max_length=64)
+    day = models.DateField()
+    runs = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveIntegerField(default=0)
+    score_min = models.PositiveSmallIntegerField(default=100)
+    score_max = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        unique_together = ('learner_key', 'day')
+
+    @property
+    def score_avg(self):
+        return round(self.score_total / self.runs, 1) if self.runs else 0
+
+    def __str__(self):
+        return f"{self.learner_key} on {self.day}"
+
+
+class SkillWeeklyRollup(models.Model):
+    """Per-learner score aggregates for one ISO week (keyed by its Monday)."""
+    learner_key = models.CharField(max_length=64)
+    week_start = models.DateField()
+    runs = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveIntegerField(default=0)
+    score_min = models.PositiveSmallIntegerField(default=100)
+    score_max = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-week_start']
+        unique_together = ('learner_key', 'week_start')
+
+    @property
+    def score_avg(self):
+        return round(self.score_total / self.runs, 1) if self.runs else 0
+
+    def __str__(self):
+        return f"{self.learner_key} week of {self.week_start}"
+
+
+class SkillProfile(models.Model):
+    """Running totals and per-metric moving averages for a learner."""
+    learner_key = models.CharField(max_length=64, unique=True)
+    runs = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveIntegerField(default=0)
+    best_score = models.PositiveSmallIntegerField(default=0)
+    last_score = models.PositiveSmallIntegerField(default=0)
+    level = models.CharField(max_length=20, blank=True)
+    metric_averages = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def score_avg(self):
+        return round(self.score_total / self.runs, 1) if self.runs else 0
+
+    def __str__(self):
+        return f"{self.learner_key} ({self.level or 'new'})"
+
+
+class LevelTransition(models.Model):
+    """Records each time a learner's detected level changes."""
+    learner_key = models.CharField(max_length=64, db_index=True)
+    from_level = models.CharField(max_length=20, blank=True)
+    to_level = models.CharField(max_length=20)
+    run = models.ForeignKey(SkillRun, on_delete=models.CASCADE, related_name='transitions')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.learner_key}: {self.from_level or '-'} -> {self.to_level}"
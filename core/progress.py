@@ -0,0 +1,179 @@
+"""Skill-score history and the per-learner rollups built from it.
+
+Every learning-mode run is stored as a ``SkillRun``. The daily, weekly and
+profile rollups are updated in the same transaction, so the dashboard and
+the mentor feedback only need a handful of single-row reads.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from .models import (
+    LevelTransition,
+    SkillDailyRollup,
+    SkillProfile,
+    SkillRun,
+    SkillWeeklyRollup,
+)
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+
+MOVING_AVERAGE_ALPHA = 0.2     # weight of the newest run in each average
+DASHBOARD_DAYS = 14
+DASHBOARD_WEEKS = 8
+DASHBOARD_TRANSITIONS = 5
+
+# =========================================================
+# LEARNER IDENTITY
+# =========================================================
+
+def learner_key_for(request, create=False):
+    """Return the learner's key, or None for a sessionless anonymous client.
+
+    Anonymous learners are tracked per browser session. A session is only
+    created when ``create`` is set, i.e. when a run is about to be recorded.
+    """
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+
+    if not request.session.session_key:
+        if not create:
+            return None
+        request.session.save()
+    return f"session:{request.session.session_key}"
+
+# =========================================================
+# RECORDING
+# =========================================================
+
+def skill_features(analysis: dict) -> dict:
+    return {
+        "functions": len(analysis["functions"]),
+        "loops": analysis["loops"],
+        "nested_loop_depth": analysis["nested_loop_depth"],
+        "conditions": analysis["conditions"],
+        "recursion": bool(analysis["recursion"]),
+        "list_comp": analysis["list_comp"],
+        "cyclomatic_complexity": analysis["cyclomatic_complexity"],
+        "unused_variables": len(analysis["unused_variables"]),
+    }
+
+def update_moving_averages(averages: dict, values: dict) -> dict:
+    updated = dict(averages)
+
+    for metric, value in values.items():
+        value = float(value)
+        if metric in updated:
+            value = updated[metric] + MOVING_AVERAGE_ALPHA * (value - updated[metric])
+        updated[metric] = round(value, 3)
+
+    return updated
+
+def _bump_rollup(model, learner_key: str, score: int, **period):
+    model.objects.get_or_create(learner_key=learner_key, **period)
+    model.objects.filter(learner_key=learner_key, **period).update(
+        runs=F("runs") + 1,
+        score_total=F("score_total") + score,
+        score_min=Least("score_min", Value(score)),
+        score_max=Greatest("score_max", Value(score)),
+    )
+
+def record_skill_run(learner_key: str, mode: str, analysis: dict, score: int, level: str):
+    """Store one run and update the rollups.
+
+    Returns ``(profile, trend)``: ``trend`` is the moving average of the
+    score *before* this run (None on the first run), so the run can be
+    compared with it.
+    """
+    features = skill_features(analysis)
+    today = timezone.localdate()
+    week_start = today - timedelta(days=today.weekday())
+
+    with transaction.atomic():
+        run = SkillRun.objects.create(
+            learner_key=learner_key,
+            mode=mode,
+            score=score,
+            level=level,
+            features=features,
+        )
+
+        _bump_rollup(SkillDailyRollup, learner_key, score, day=today)
+        _bump_rollup(SkillWeeklyRollup, learner_key, score, week_start=week_start)
+
+        profile, _ = SkillProfile.objects.select_for_update().get_or_create(
+            learner_key=learner_key
+        )
+        previous_level = profile.level
+        trend = profile.metric_averages.get("score")
+
+        profile.runs += 1
+        profile.score_total += score
+        profile.best_score = max(profile.best_score, score)
+        profile.last_score = score
+        profile.level = level
+        profile.metric_averages = update_moving_averages(
+            profile.metric_averages, {"score": score, **features}
+        )
+        profile.save()
+
+        if previous_level != level:
+            LevelTransition.objects.create(
+                learner_key=learner_key,
+                from_level=previous_level,
+                to_level=level,
+                run=run,
+            )
+
+    return profile, trend
+
+# =========================================================
+# READING
+# =========================================================
+
+def _rollup_row(rollup, period: str) -> dict:
+    return {
+        period: getattr(rollup, period).isoformat(),
+        "runs": rollup.runs,
+        "score_avg": rollup.score_avg,
+        "score_min": rollup.score_min,
+        "score_max": rollup.score_max,
+    }
+
+def get_progress_summary(learner_key: str) -> dict:
+    profile = SkillProfile.objects.filter(learner_key=learner_key).first()
+    if profile is None:
+        return {"runs": 0}
+
+    today = timezone.localdate()
+    daily = SkillDailyRollup.objects.filter(
+        learner_key=learner_key,
+        day__gt=today - timedelta(days=DASHBOARD_DAYS),
+    )
+    weekly = SkillWeeklyRollup.objects.filter(learner_key=learner_key)[:DASHBOARD_WEEKS]
+    transitions = LevelTransition.objects.filter(learner_key=learner_key)[:DASHBOARD_TRANSITIONS]
+
+    return {
+        "runs": profile.runs,
+        "level": profile.level,
+        "score_avg": profile.score_avg,
+        "best_score": profile.best_score,
+        "last_score": profile.last_score,
+        "moving_averages": profile.metric_averages,
+        "daily": [_rollup_row(r, "day") for r in daily],
+        "weekly": [_rollup_row(r, "week_start") for r in weekly],
+        "level_transitions": [
+            {
+                "from": t.from_level,
+                "to": t.to_level,
+                "at": t.created_at.isoformat(),
+            }
+            for t in transitions
+        ],
+    }
@@ -0,0 +1,93 @@
+"""Structural-fingerprint cache for learning-mode analysis and reports.
+
+Students solving the same assignment often submit programs that differ
+only in names, literal values and formatting. ``fingerprint`` reduces an
+AST to its shape. Literal values are dropped, and every identifier is
+replaced by the order in which it first appears. So ``total = total + x``
+and ``s = s + n`` share a key, while ``s = t + n`` does not. Anything
+that depends on names only through which ones are equal, like
+``advanced_code_analysis``, can be cached under that key and mapped back
+to the submission's own names on a hit.
+"""
+
+import ast
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+def fingerprint(tree: ast.AST):
+    """Return ``(key, names)``; ``names[i]`` is the identifier numbered ``i``."""
+    names = {}
+    parts = []
+    append = parts.append
+    stack = [tree]
+
+    # Iterative pre-order walk; long expression chains nest too deep to recurse
+    while stack:
+        node = stack.pop()
+        kind = type(node)
+        if kind is list:
+            append(f"[{len(node)}")
+            stack.extend(reversed(node))
+        elif kind is str:
+            append(str(names.setdefault(node, len(names))))
+        elif isinstance(node, ast.AST):
+            append(kind.__name__)
+            if kind is not ast.Constant:
+                for field in _reversed_fields(kind):
+                    stack.append(getattr(node, field, None))
+        else:
+            append(repr(node))
+
+    key = hashlib.blake2b("\0".join(parts).encode(), digest_size=16).hexdigest()
+    return key, list(names)
+
+@functools.lru_cache(maxsize=None)
+def _reversed_fields(kind) -> tuple:
+    return tuple(reversed(kind._fields))
+
+class ReportCache:
+    """Thread-safe bounded LRU with hit/miss counters."""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
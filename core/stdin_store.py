@@ -0,0 +1,92 @@
+"""Large stdin for runs: upload limits, spooling and the blob store.
+
+Data-processing exercises can need megabytes of input. Instead of a JSON
+``user_input`` string, that input arrives as a multipart ``stdin`` file,
+or as the key of a blob uploaded earlier through ``/run/stdin/``. Either
+way it ends up as a file on disk, and that file's descriptor becomes the
+child's stdin. The bytes are never pumped through a pipe or held in a
+Python string.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from .build_cache import BuildCache
+
+BLOB_KEY = re.compile(r"[0-9a-f]{64}")
+
+class StdinRejected(Exception):
+    """Input refused before the run; the message is shown to the user."""
+
+class StdinLimitHandler(FileUploadHandler):
+    """Stop reading uploads once they exceed ``limit`` bytes in total.
+
+    Inserted in front of Django's own handlers, so chunks are counted
+    before they are spooled anywhere.
+    """
+
+    def __init__(self, limit, request=None):
+        super().__init__(request)
+        self.limit = limit
+        self.received = 0
+        self.exceeded = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            self.exceeded = True
+            raise StopUpload()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+def spool_upload(upload):
+    """Return a binary file positioned at the start of ``upload``."""
+    if hasattr(upload, "temporary_file_path"):
+        # Django already spooled it to disk; reuse that file
+        return open(upload.temporary_file_path(), "rb")
+
+    spool = tempfile.TemporaryFile()
+    for chunk in upload.chunks():
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+class StdinBlobStore(BuildCache):
+    """Content-addressed stdin blobs, evicted like build artifacts."""
+
+    def store_upload(self, upload) -> str:
+        self._ensure_root()
+
+        staging = os.path.join(self.root, f".{uuid.uuid4().hex}")
+        digest = hashlib.sha256()
+        with open(staging, "wb") as f:
+            for chunk in upload.chunks():
+                digest.update(chunk)
+                f.write(chunk)
+
+        key = digest.hexdigest()
+        os.replace(staging, self._path(key))
+        self.evict()
+        return key
+
+    def open(self, key: str):
+        """Open the blob for ``key`` for reading; None on a miss."""
+        if not BLOB_KEY.fullmatch(key):
+            return None
+
+        path = self._path(key)
+        try:
+            blob = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        # An open descriptor survives eviction, so the run is unaffected
+        os.utime(path)
+        return blob
@@ -0,0 +1,462 @@
+import ast
+import os
+import shutil
+import stat
+import tempfile
+from datetime import date
+from unittest import mock, skipUnless
+
+from django.contrib.sessions.models import Session
+from django.test import Client, SimpleTestCase, TestCase
+
+from . import views
+from .build_cache import BuildCache
+from .fastpath import FastPathPool
+from .management.commands.grade_bulk import find_syntax_error, grade_submission
+from .models import LevelTransition, SkillDailyRollup, SkillProfile, SkillRun, SkillWeeklyRollup
+from .progress import get_progress_summary, record_skill_run
+from .report_cache import fingerprint
+
+GENERATOR_ESCAPE = """def g():
+    yield it.gi_frame.f_back
+it = g()
+frame = next(it)
+while frame.f_back:
+    frame = frame.f_back
+mod = frame.f_globals
+mod["run_job"] = lambda job, channel: {"status": "ok", "stdout": "HIJACKED", "stderr": ""}
+"""
+
+def eligible(code):
+    return views.is_fast_path_eligible({"main.py": code}, "main.py")
+
+class FastPathEligibilityTests(SimpleTestCase):
+
+    def test_plain_snippets_are_eligible(self):
+        self.assertTrue(eligible('print("Hello")\n'))
+        self.assertTrue(eligible('name = input("Name: ")\nprint(name.strip().title())\n'))
+        self.assertTrue(eligible("words = []\nwords.append('a')\nprint(', '.join(words))\n"))
+        self.assertTrue(eligible('print("{} + {} = {}".format(1, 2, 3))\n'))
+
+    def test_own_classes_are_eligible(self):
+        code = (
+            "class Stack:\n"
+            "    size = 0\n"
+            "    def __init__(self):\n"
+            "        self.items = []\n"
+            "    def push(self, x):\n"
+            "        self.items.append(x)\n"
+            "s = Stack()\n"
+            "s.push(1)\n"
+            "print(s.items, s.size)\n"
+        )
+        self.assertTrue(eligible(code))
+
+    def test_generator_frame_escape_is_rejected(self):
+        self.assertFalse(eligible(GENERATOR_ESCAPE))
+
+    def test_internal_attributes_are_rejected(self):
+        for attr in ("gi_frame", "gi_code", "cr_frame", "ag_frame", "tb_frame",
+                     "tb_next", "f_back", "f_globals", "co_consts", "mro"):
+            with self.subTest(attr=attr):
+                self.assertFalse(eligible(f"x = [1]\nprint(x.{attr})\n"))
+
+    def test_internal_names_as_own_attributes_are_rejected(self):
+        code = (
+            "class Box:\n"
+            "    pass\n"
+            "b = Box()\n"
+            "b.f_back = 1\n"
+            "print(b.f_back)\n"
+        )
+        self.assertFalse(eligible(code))
+
+    def test_unknown_attributes_are_rejected(self):
+        self.assertFalse(eligible("x = StopIteration(1)\nprint(x.value)\n"))
+
+    def test_format_field_attribute_access_is_rejected(self):
+        self.assertFalse(eligible('def g():\n    yield 1\nprint("{0.gi_frame}".format(g()))\n'))
+        self.assertFalse(eligible('print("{0[0]}".format([1]))\n'))
+        self.assertFalse(eligible('print("{0:{1.real}}".format(1, 2))\n'))
+        self.assertFalse(eligible('text = "{0}"\nprint(text.format(1))\n'))
+
+    def test_dunders_imports_and_bare_except_are_rejected(self):
+        self.assertFalse(eligible("print((1).__class__)\n"))
+        self.assertFalse(eligible('print("__")\n'))
+        self.assertFalse(eligible("import math\nprint(math.pi)\n"))
+        self.assertFalse(eligible("try:\n    x = 1\nexcept:\n    pass\n"))
+
+    def test_unlisted_builtins_are_rejected(self):
+        for name in ("open", "getattr", "eval", "vars", "globals"):
+            with self.subTest(name=name):
+                self.assertFalse(eligible(f"print({name})\n"))
+
+    def test_multiple_files_are_rejected(self):
+        files = {"main.py": "print(1)\n", "helper.py": "x = 1\n"}
+        self.assertFalse(views.is_fast_path_eligible(files, "main.py"))
+
+@skipUnless(views.FAST_PATH_ENABLED, "the fast path only runs on Linux")
+class FastPathIsolationTests(SimpleTestCase):
+
+    def job(self, code):
+        return {
+            "code": code,
+            "filename": "main.py",
+            "input": [],
+            "max_lines": views.FAST_PATH_MAX_LINES,
+            "max_seconds": 1,
+            "max_output": views.MAX_OUTPUT_SIZE,
+        }
+
+    def test_job_cannot_tamper_with_later_jobs(self):
+        # Bypass the eligibility check: isolation must hold on its own
+        pool = FastPathPool(1, preexec_fn=views.limit_fast_path_worker)
+        pool.run(self.job(GENERATOR_ESCAPE))
+
+        result = pool.run(self.job("print('victim', 1)\n"))
+        self.assertEqual(result["stdout"], "victim 1\n")
+
+    def test_runaway_job_falls_back_and_worker_survives(self):
+        pool = FastPathPool(1, preexec_fn=views.limit_fast_path_worker)
+        self.assertIsNone(pool.run(self.job("print(sum(range(10 ** 10)))\n")))
+
+        result = pool.run(self.job("print('still here')\n"))
+        self.assertEqual(result["stdout"], "still here\n")
+
+    def test_fast_path_matches_sandbox(self):
+        files = {"main.py": "items = [3, 1, 2]\nitems.sort()\nprint(items[5])\n"}
+        fast = views.execute_python(files, "main.py")
+        sandbox = views.execute_python(files, "main.py", fast_path=False)
+        self.assertEqual(fast["stdout"], sandbox["stdout"])
+        # The sandbox path is a random temp dir; the error itself must match
+        self.assertEqual(fast["stderr"].splitlines()[-3:], sandbox["stderr"].splitlines()[-3:])
+
+@skipUnless(views.IS_LINUX, "memory mode limits need Linux")
+class MemoryModeTests(SimpleTestCase):
+
+    def test_large_list_gets_a_report(self):
+        code = "data = [str(i) for i in range(1_000_000)]\nprint(len(data))\n"
+        files = {"main.py": code}
+        result = views.execute_python(files, "main.py", memory=True)
+
+        self.assertEqual(result["stdout"], "1000000\n")
+        self.assertEqual(result["stderr"], "")
+        report = result["memory"]
+        self.assertGreater(report["peak"], 50 * 1024 * 1024)
+        self.assertEqual(report["top_lines"][0]["file"], "main.py")
+        self.assertEqual(report["top_lines"][0]["line"], 1)
+
+        output = views.memory_report(report, files, "main.py", result["stdout"], result["stderr"])
+        self.assertIn("main.py line 1", output)
+        self.assertTrue(output.endswith("1000000\n"))
+
+    def test_output_is_kept_without_a_report(self):
+        output = views.memory_report(None, {"main.py": ""}, "main.py", "partial\n", "")
+        self.assertIn("could not be measured", output)
+        self.assertTrue(output.endswith("partial\n"))
+
+class TraceLimitTests(SimpleTestCase):
+
+    CODE = "for i in range(10):\n    x = i\n"
+
+    def trace(self):
+        return views.execute_python({"main.py": self.CODE}, "main.py", trace=True)["trace"]
+
+    def test_sampling_setting_reaches_the_tracer(self):
+        full = self.trace()
+        with mock.patch.object(views, "TRACE_SAMPLE_EVERY", 5):
+            sampled = self.trace()
+
+        self.assertEqual(sampled["line_events"], full["line_events"])
+        lines = [step for step in sampled["steps"] if step[0] == "L"]
+        self.assertEqual(len(lines), full["line_events"] // 5)
+
+    def test_step_cap_setting_reaches_the_tracer(self):
+        with mock.patch.object(views, "TRACE_MAX_STEPS", 5):
+            trace = self.trace()
+
+        self.assertEqual(len(trace["steps"]), 5)
+        self.assertTrue(trace["truncated"])
+
+class FileNameTests(SimpleTestCase):
+
+    def test_plain_names_are_accepted(self):
+        for name in ("main.py", "main.c", "helper_2.cpp", "data-set.txt"):
+            with self.subTest(name=name):
+                self.assertTrue(views.is_safe_filename(name))
+
+    def test_options_paths_and_hidden_names_are_rejected(self):
+        for name in ("-specs=evil.c", "-o", "../main.c", "a/b.c", "a\\b.c",
+                     ".hidden", "..", "", "main.c\n", None):
+            with self.subTest(name=name):
+                self.assertFalse(views.is_safe_filename(name))
+
+    def test_compiler_never_sees_option_like_names(self):
+        files = {
+            "main.c": "int main(void) { return 0; }\n",
+            "-specs=evil.c": "",
+            "evil.c": "*cc1:\n%{!fsyntax-only:%e pwned by spec}\n",
+        }
+        result = views.execute_compiled(files, "main.c", "c")
+        self.assertEqual(result["stderr"], "Invalid file name")
+
+@skipUnless(views.IS_LINUX and shutil.which("gcc"), "needs Linux and gcc")
+class NativeSandboxTests(SimpleTestCase):
+
+    def test_function_pointer_to_system_cannot_spawn(self):
+        code = (
+            "#include <stdio.h>\n"
+            "#include <stdlib.h>\n"
+            "int main(void) {\n"
+            "    int (*run)(const char *) = system;\n"
+            "    run(\"echo pwned\");\n"
+            "    puts(\"done\");\n"
+            "    return 0;\n"
+            "}\n"
+        )
+        # The regex check cannot see this; the process limits must stop it
+        self.assertTrue(views.is_safe_native(code))
+
+        result = views.execute_compiled({"main.c": code}, "main.c", "c")
+        self.assertEqual(result["stdout"], "done\n")
+
+    def test_absolute_and_parent_includes_are_rejected(self):
+        for header in ('"/etc/shadow"', "</etc/passwd>", '"../secret.h"', '"a/../../b.h"'):
+            with self.subTest(header=header):
+                self.assertFalse(views.is_safe_native(f"#include {header}\nint main(void) {{ return 0; }}\n"))
+        self.assertFalse(views.is_safe_native('#import "/etc/shadow"\n'))
+        self.assertTrue(views.is_safe_native('#include "helper.h"\n#include <stdio.h>\n'))
+
+    @skipUnless(views.SANDBOX_UID is not None, "needs root to switch users")
+    def test_compiler_cannot_read_server_files(self):
+        # A macro hides the path from the regex; the compiler's uid must stop it
+        code = '#define SECRET "/etc/shadow"\n#include SECRET\nint main(void) { return 0; }\n'
+        self.assertTrue(views.is_safe_native(code))
+
+        result = views.execute_compiled({"main.c": code}, "main.c", "c")
+        self.assertIn("Permission denied", result["stderr"])
+        self.assertNotIn("root:", result["stderr"])
+
+class BuildCacheRootTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_root_is_created_private(self):
+        root = os.path.join(self.tmp.name, "cache")
+        self.assertFalse(BuildCache(root).fetch("key", os.path.join(self.tmp.name, "out")))
+        self.assertEqual(stat.S_IMODE(os.stat(root).st_mode), 0o700)
+
+    def test_symlinked_root_is_refused(self):
+        target = os.path.join(self.tmp.name, "target")
+        os.mkdir(target, 0o700)
+        link = os.path.join(self.tmp.name, "link")
+        os.symlink(target, link)
+
+        with self.assertRaises(PermissionError):
+            BuildCache(link).fetch("key", os.path.join(self.tmp.name, "out"))
+
+    @skipUnless(hasattr(os, "geteuid") and os.geteuid() == 0, "needs root to chown")
+    def test_root_owned_by_another_user_is_refused(self):
+        root = os.path.join(self.tmp.name, "planted")
+        os.mkdir(root, 0o700)
+        os.chown(root, 65534, 65534)
+
+        with self.assertRaises(PermissionError):
+            BuildCache(root).fetch("key", os.path.join(self.tmp.name, "out"))
+
+class MultiFileSubmissionTests(SimpleTestCase):
+
+    def test_imports_of_own_modules_are_allowed(self):
+        files = {"main.py": "from helper import h\nprint(h(2))\n", "helper.py": "def h(x):\n    return x\n"}
+        self.assertTrue(views.is_safe_import(files["main.py"], views.local_modules(files)))
+        self.assertFalse(views.is_safe_import(files["main.py"]))
+
+    def test_own_modules_cannot_shadow_stdlib_or_unsafe_names(self):
+        files = {"main.py": "import os\n", "os.py": "", "socket.py": "", "json.py": ""}
+        self.assertEqual(views.local_modules(files), frozenset({"main"}))
+        self.assertFalse(views.is_safe_import("import os\n", views.local_modules(files)))
+
+    def test_grade_bulk_accepts_multi_file_submission(self):
+        submission = {
+            "id": "multi",
+            "files": {"main.py": "from helper import h\nprint(h(2))\n",
+                      "helper.py": "def h(x):\n    return x * 21\n"},
+            "main_file": "main.py",
+        }
+        self.assertEqual(grade_submission(submission, execute=False)["status"], "ok")
+
+    def test_syntax_errors_in_any_file_are_reported(self):
+        files = {"main.py": "import helper\n", "helper.py": "def h(:\n    pass\n"}
+        self.assertIn("helper.py", find_syntax_error(files, "main.py"))
+        self.assertIsNone(find_syntax_error({"main.py": "print(1)\n"}, "main.py"))
+
+class LearnerSessionTests(TestCase):
+
+    def run_code(self, mode):
+        # A fresh client per request: no session cookie is ever sent back
+        payload = {"files": {"main.py": "print(1)\n"}, "main_file": "main.py", "mode": mode}
+        return Client().post("/run/python/", payload, content_type="application/json")
+
+    def test_modes_that_record_nothing_create_no_session(self):
+        for mode in ("challenge", "explain", "compiler"):
+            self.run_code(mode)
+
+        self.assertEqual(Session.objects.count(), 0)
+        self.assertEqual(Client().get("/progress/").json(), {"runs": 0})
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_mentor_mode_records_under_a_new_session(self):
+        self.run_code("mentor")
+
+        self.assertEqual(Session.objects.count(), 1)
+        run = SkillRun.objects.get()
+        self.assertEqual(run.learner_key, f"session:{Session.objects.get().session_key}")
+
+class SkillProgressTests(TestCase):
+
+    KEY = "user:1"
+
+    def record(self, score, day=date(2026, 10, 14)):
+        analysis = views.advanced_code_analysis("print(1)\n")
+        with mock.patch("core.progress.timezone.localdate", return_value=day):
+            return record_skill_run(self.KEY, "mentor", analysis, score, views.detect_level(score))
+
+    def test_daily_and_weekly_rollups(self):
+        self.record(40, date(2026, 10, 12))    # Monday
+        self.record(80, date(2026, 10, 12))
+        self.record(20, date(2026, 10, 14))
+        self.record(60, date(2026, 10, 19))    # next Monday
+
+        monday = SkillDailyRollup.objects.get(learner_key=self.KEY, day=date(2026, 10, 12))
+        self.assertEqual((monday.runs, monday.score_min, monday.score_max, monday.score_avg), (2, 40, 80, 60))
+
+        week = SkillWeeklyRollup.objects.get(learner_key=self.KEY, week_start=date(2026, 10, 12))
+        self.assertEqual((week.runs, week.score_min, week.score_max, week.score_avg), (3, 20, 80, 46.7))
+
+        next_week = SkillWeeklyRollup.objects.get(learner_key=self.KEY, week_start=date(2026, 10, 19))
+        self.assertEqual((next_week.runs, next_week.score_min, next_week.score_max), (1, 60, 60))
+
+        profile = SkillProfile.objects.get(learner_key=self.KEY)
+        self.assertEqual((profile.runs, profile.score_avg, profile.best_score, profile.last_score), (4, 50, 80, 60))
+
+    def test_moving_average_is_reported_from_before_the_run(self):
+        trends = [self.record(score)[1] for score in (40, 80, 20)]
+        self.assertEqual(trends, [None, 40.0, 48.0])
+
+        # 48 + 0.2 * (20 - 48)
+        profile = SkillProfile.objects.get(learner_key=self.KEY)
+        self.assertEqual(profile.metric_averages["score"], 42.4)
+
+    def test_progress_lines_compare_with_the_previous_average(self):
+        profile, trend = self.record(40)
+        self.assertEqual(views.progress_lines(40, profile, trend), [])
+
+        profile, trend = self.record(80)
+        self.assertIn("above your recent average", views.progress_lines(80, profile, trend)[1])
+
+    def test_level_transitions(self):
+        for score in (40, 45, 80, 20):      # Intermediate, same, Advanced, Beginner
+            self.record(score)
+
+        transitions = [
+            (t.from_level, t.to_level)
+            for t in LevelTransition.objects.filter(learner_key=self.KEY).order_by("pk")
+        ]
+        self.assertEqual(transitions, [
+            ("", "Intermediate"),
+            ("Intermediate", "Advanced"),
+            ("Advanced", "Beginner"),
+        ])
+        self.assertEqual(get_progress_summary(self.KEY)["level"], "Beginner")
+
+SHAPE_PROGRAMS = {
+    "loops": (
+        "total = 0\n"
+        "for i in range(10):\n"
+        "    for j in range(i):\n"
+        "        if i % 2 == 0 and j > 1:\n"
+        "            total = total + i * j\n"
+        "unused = 5\n"
+        "print(total)\n"
+    ),
+    "recursion": (
+        "def fact(n):\n"
+        "    if n <= 1:\n"
+        "        return 1\n"
+        "    return n * fact(n - 1)\n"
+        "print(fact(5))\n"
+    ),
+    "comprehension": (
+        "def evens(items):\n"
+        "    kept = [x for x in items if x % 2 == 0]\n"
+        "    return kept\n"
+        "values = list(range(20))\n"
+        "while values:\n"
+        "    values.pop()\n"
+        "print(evens([1, 2, 3, 4]))\n"
+    ),
+    "classes": (
+        "class Stack:\n"
+        "    def __init__(self):\n"
+        "        self.items = []\n"
+        "    def push(self, item):\n"
+        "        self.items.append(item)\n"
+        "try:\n"
+        "    s = Stack()\n"
+        "    s.push(1)\n"
+        "except ValueError as error:\n"
+        "    print(error)\n"
+    ),
+}
+
+def rename(code):
+    """Consistently rename every identifier, the way students differ."""
+    tree = ast.parse(code)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant):
+            continue
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, str):
+                setattr(node, field, f"renamed_{value}")
+            elif isinstance(value, list) and value and all(isinstance(v, str) for v in value):
+                setattr(node, field, [f"renamed_{v}" for v in value])
+    return ast.unparse(tree) + "\n"
+
+def shape_key(code):
+    return fingerprint(ast.parse(code))[0]
+
+class ReportCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        views.REPORT_CACHE.clear()
+        views.SOURCE_CACHE.clear()
+
+    def test_renamed_programs_share_a_key(self):
+        for name, code in SHAPE_PROGRAMS.items():
+            with self.subTest(program=name):
+                self.assertEqual(shape_key(code), shape_key(rename(code)))
+
+    def test_different_name_equalities_get_different_keys(self):
+        self.assertNotEqual(
+            shape_key("def f(x):\n    return f(x)\n"),
+            shape_key("def f(x):\n    return g(x)\n"),
+        )
+        self.assertNotEqual(shape_key("s = s + n\n"), shape_key("s = t + n\n"))
+
+    def test_cached_analysis_matches_direct_analysis(self):
+        for name, code in SHAPE_PROGRAMS.items():
+            renamed = rename(code)
+            with self.subTest(program=name):
+                # The second lookup is a hit on the first program's shape
+                self.assertEqual(views.cached_analysis(code)[0], views.advanced_code_analysis(code))
+                self.assertEqual(views.cached_analysis(renamed)[0], views.advanced_code_analysis(renamed))
+
+        stats = views.REPORT_CACHE.stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (len(SHAPE_PROGRAMS),) * 2)
+
+    def test_recursion_is_not_shared_with_a_call_to_another_function(self):
+        recursive, other = "def f(x):\n    return f(x)\n", "def f(x):\n    return g(x)\n"
+        self.assertTrue(views.cached_analysis(recursive)[0]["recursion"])
+        self.assertFalse(views.cached_analysis(other)[0]["recursion"])
@@ -0,0 +1,295 @@
+"""Step tracer for trace mode.
+
+Runs inside the sandboxed child process instead of the user's main file:
+
+    python tracer.py <trace_out> <main_file> [max_steps] [max_bytes] [sample_every]
+
+The program runs normally and a compact step list is written to
+``trace_out``. On Python 3.12+ ``sys.monitoring`` is used, and events are
+disabled for any code outside the user's workspace, so the standard library
+runs at full speed. Older interpreters fall back to ``sys.settrace``.
+
+This file is executed as a standalone script and must only use the stdlib.
+
+Trace format (``steps``):
+    ["C", line, function_id]                  call
+    ["L", line, function_id, {name: repr}]    line (only changed variables)
+    ["R", line, function_id, return_repr]     return
+"""
+
+import itertools
+import json
+import os
+import sys
+import types
+
+# =========================================================
+# CONFIGURATION
+# =========================================================
+
+MAX_STEPS = 2000
+MAX_TRACE_BYTES = 256 * 1024
+SAMPLE_EVERY = 1               # record every Nth line event
+MAX_REPR = 40                  # characters per variable snapshot
+MAX_ITEMS = 6                  # container entries per variable snapshot
+
+CALL, LINE, RETURN = "C", "L", "R"
+
+SKIPPED_TYPES = (
+    types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, type,
+)
+
+_BRACKETS = {list: "[]", tuple: "()", set: "{}", frozenset: "{}"}
+
+def safe_repr(value, depth=2) -> str:
+    # Bounded work per value: containers are cut to MAX_ITEMS entries and
+    # REPR_DEPTH levels, so snapshotting large data stays cheap.
+    kind = type(value)
+    brackets = _BRACKETS.get(kind)
+
+    if brackets is not None or kind is dict:
+        if not value:
+            return repr(value)
+        opening, closing = brackets or "{}"
+        if depth == 0:
+            return f"{opening}…{closing}"
+        if kind is dict:
+            items = [
+                f"{safe_repr(k, 0)}: {safe_repr(v, depth - 1)}"
+                for k, v in itertools.islice(value.items(), MAX_ITEMS)
+            ]
+        else:
+            items = [safe_repr(v, depth - 1) for v in itertools.islice(value, MAX_ITEMS)]
+        if len(value) > MAX_ITEMS:
+            items.append(f"…+{len(value) - MAX_ITEMS}")
+        return opening + ", ".join(items) + closing
+
+    if kind is str and len(value) > MAX_REPR:
+        return repr(value[:MAX_REPR]) + "…"
+
+    try:
+        text = repr(value)
+    except Exception:
+        return "<unrepresentable>"
+    return text if len(text) <= MAX_REPR else text[:MAX_REPR] + "…"
+
+# =========================================================
+# RECORDER
+# =========================================================
+
+class StepRecorder:
+
+    def __init__(self, workspace, max_steps=MAX_STEPS,
+                 max_bytes=MAX_TRACE_BYTES, sample_every=SAMPLE_EVERY):
+        self.workspace = os.path.join(os.path.abspath(workspace), "")
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self.sample_every = max(1, sample_every)
+
+        self.steps = []
+        self.functions = []
+        self.size = 0
+        self.line_events = 0
+        self.truncated = False
+        self.stop = lambda: None
+
+        self._function_ids = {}
+        self._snapshots = {}
+
+    def is_user_code(self, code) -> bool:
+        return code.co_filename.startswith(self.workspace)
+
+    def function_id(self, code) -> int:
+        fid = self._function_ids.get(code)
+        if fid is None:
+            fid = len(self.functions)
+            self._function_ids[code] = fid
+            self.functions.append([
+                code.co_name,
+                os.path.relpath(code.co_filename, self.workspace),
+                code.co_firstlineno,
+            ])
+        return fid
+
+    def variable_delta(self, frame) -> dict:
+        previous = self._snapshots.get(id(frame), {})
+        current = {}
+        delta = {}
+
+        for name, value in frame.f_locals.items():
+            if name.startswith("__") or isinstance(value, SKIPPED_TYPES):
+                continue
+            text = safe_repr(value)
+            current[name] = text
+            if previous.get(name) != text:
+                delta[name] = text
+
+        self._snapshots[id(frame)] = current
+        return delta
+
+    def _append(self, step):
+        size = len(json.dumps(step, separators=(",", ":"))) + 1
+        if len(self.steps) >= self.max_steps or self.size + size > self.max_bytes:
+            self.truncated = True
+            self.stop()
+            return
+        self.steps.append(step)
+        self.size += size
+
+    # ---------------- events ----------------
+
+    def on_call(self, code, frame):
+        if self.truncated:
+            return
+        self._append([CALL, code.co_firstlineno, self.function_id(code)])
+
+    def on_line(self, code, line, frame):
+        if self.truncated:
+            return
+        self.line_events += 1
+        if self.line_events % self.sample_every:
+            return
+        self._append([LINE, line, self.function_id(code), self.variable_delta(frame)])
+
+    def on_return(self, code, frame, value):
+        self._snapshots.pop(id(frame), None)
+        if self.truncated:
+            return
+        self._append([RETURN, frame.f_lineno, self.function_id(code), safe_repr(value)])
+
+    def on_unwind(self, frame):
+        self._snapshots.pop(id(frame), None)
+
+    def result(self, engine: str) -> dict:
+        return {
+            "engine": engine,
+            "functions": self.functions,
+            "steps": self.steps,
+            "line_events": self.line_events,
+            "truncated": self.truncated,
+            "bytes": self.size,
+        }
+
+# =========================================================
+# ENGINES
+# =========================================================
+
+def trace_with_monitoring(recorder, run):
+    monitoring = sys.monitoring
+    events = monitoring.events
+    tool = monitoring.DEBUGGER_ID
+    disable = monitoring.DISABLE
+
+    def on_start(code, offset):
+        if not recorder.is_user_code(code):
+            return disable
+        recorder.on_call(code, sys._getframe(1))
+
+    def on_line(code, line):
+        if not recorder.is_user_code(code):
+            return disable
+        recorder.on_line(code, line, sys._getframe(1))
+
+    def on_return(code, offset, value):
+        if not recorder.is_user_code(code):
+            return disable
+        recorder.on_return(code, sys._getframe(1), value)
+
+    def on_unwind(code, offset, exc):
+        if recorder.is_user_code(code):
+            recorder.on_unwind(sys._getframe(1))
+
+    monitoring.use_tool_id(tool, "devetryx-tracer")
+    monitoring.register_callback(tool, events.PY_START, on_start)
+    monitoring.register_callback(tool, events.LINE, on_line)
+    monitoring.register_callback(tool, events.PY_RETURN, on_return)
+    monitoring.register_callback(tool, events.PY_UNWIND, on_unwind)
+
+    recorder.stop = lambda: monitoring.set_events(tool, 0)
+    monitoring.set_events(
+        tool,
+        events.PY_START | events.LINE | events.PY_RETURN | events.PY_UNWIND
+    )
+    try:
+        run()
+    finally:
+        monitoring.set_events(tool, 0)
+        monitoring.free_tool_id(tool)
+
+def trace_with_settrace(recorder, run):
+
+    def local_trace(frame, event, arg):
+        if recorder.truncated:
+            return None
+        if event == "line":
+            recorder.on_line(frame.f_code, frame.f_lineno, frame)
+        elif event == "return":
+            recorder.on_return(frame.f_code, frame, arg)
+        return local_trace
+
+    def global_trace(frame, event, arg):
+        if event != "call" or not recorder.is_user_code(frame.f_code):
+            return None
+        recorder.on_call(frame.f_code, frame)
+        return local_trace
+
+    recorder.stop = lambda: sys.settrace(None)
+    sys.settrace(global_trace)
+    try:
+        run()
+    finally:
+        sys.settrace(None)
+
+# =========================================================
+# ENTRY POINT
+# =========================================================
+
+def run_as_main(main_file):
+    # Equivalent to runpy.run_path(..., run_name="__main__") without
+    # importing runpy/pkgutil, which noticeably slows interpreter start.
+    with open(main_file, "rb") as f:
+        code = compile(f.read(), main_file, "exec")
+
+    module = types.ModuleType("__main__")
+    module.__file__ = main_file
+    sys.modules["__main__"] = module
+    exec(code, module.__dict__)
+
+def main(argv):
+    trace_out, main_file = argv[1], os.path.abspath(argv[2])
+    limits = [int(a) for a in argv[3:6]]
+    workspace = os.path.dirname(main_file)
+
+    # Behave like `python main_file` for the user's program
+    sys.argv = [main_file]
+    sys.path[0] = workspace
+
+    recorder = StepRecorder(workspace, *limits)
+    if hasattr(sys, "monitoring"):
+        engine, tracer = "monitoring", trace_with_monitoring
+    else:
+        engine, tracer = "settrace", trace_with_settrace
+    exit_code = 0
+
+    try:
+        tracer(recorder, lambda: run_as_main(main_file))
+    except SystemExit as e:
+        exit_code = e.code
+    except BaseException as e:
+        import traceback
+
+        # Hide the tracer's own frames from the user's traceback
+        tb = e.__traceback__
+        while tb is not None and not recorder.is_user_code(tb.tb_frame.f_code):
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb)
+        exit_code = 1
+    finally:
+        with open(trace_out, "w", encoding="utf-8") as f:
+            f.write(json.dumps(recorder.result(engine), separators=(",", ":")))
+
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main(sys.argv)
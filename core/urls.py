@@ -7,6 +7,11 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('contact/', views.contact, name='contact'),
     path('contact-submit/', views.contact_submit, name='contact_submit'),
+    path('run/stdin/', views.upload_stdin, name='run_stdin'),
     path('run/python/', views.run_python_code, name='run_python'),
+    path('run/c/', views.run_compiled_code, {'language': 'c'}, name='run_c'),
+    path('run/cpp/', views.run_compiled_code, {'language': 'cpp'}, name='run_cpp'),
     path('Python_compiler/', views.python_compiler,name='python_compiler'),
+    path('progress/', views.progress, name='progress'),
+    path('report-cache/', views.report_cache_stats, name='report_cache'),
 ]
@@ -1,12 +1,21 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 
+from .build_cache import BuildCache
+from .fastpath import FAST_PATH_BUILTINS, FastPathPool
 from .models import ContactMessage
+from .progress import get_progress_summary, learner_key_for, record_skill_run
+from .report_cache import ReportCache, fingerprint
+from .stdin_store import StdinBlobStore, StdinLimitHandler, StdinRejected, spool_upload
 
 import re
 import sys
+import signal
+import hashlib
+import functools
 import json
 import tempfile
 import subprocess
@@ -15,12 +24,17 @@ import ast
 import base64
 import glob
 import uuid
+import shutil
 import py_compile
 import platform
+import string
+import types
 
 IS_LINUX = platform.system() == "Linux"
 
 if IS_LINUX:
+    import ctypes
+    import pwd
     import resource
 
 # =========================================================
@@ -29,8 +43,75 @@ if IS_LINUX:
 
 MAX_OUTPUT_SIZE = 8000        # prevent terminal flooding
 EXECUTION_TIMEOUT = 20         # seconds
+MAX_CPU_SECONDS = 5
 MAX_MEMORY_MB = 256
 
+TRACE_MAX_STEPS = 2000         # steps kept in a trace-mode replay
+TRACE_MAX_BYTES = 256 * 1024   # encoded size of those steps
+TRACE_SAMPLE_EVERY = 1         # record every Nth line event (1 = all)
+
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACER_SCRIPT = os.path.join(CORE_DIR, "tracer.py")
+
+LARGE_ALLOCATION = 1024 * 1024   # bytes before a line gets a memory tip
+PROFILER_MEMORY_HEADROOM_MB = 768  # tracemalloc and trace copies, memory mode only
+PROFILER_CPU_HEADROOM = 10         # seconds on top of MAX_CPU_SECONDS, memory mode only
+
+COMPILE_TIMEOUT = 15           # seconds, separate from EXECUTION_TIMEOUT
+COMPILER_MEMORY_MB = 1024
+NATIVE_FILE_SIZE_MB = 16       # largest file a native program may write
+
+BUILD_CACHE = BuildCache(os.path.join(settings.DEVETRYX_DATA_DIR, "build-cache"))
+
+FAST_PATH_ENABLED = IS_LINUX
+FAST_PATH_WORKERS = 2
+FAST_PATH_TIMEOUT = 2          # seconds before falling back to the sandbox
+FAST_PATH_MAX_LINES = 200_000  # line events before falling back
+
+MAX_STDIN_BYTES = 32 * 1024 * 1024   # per uploaded stdin file
+
+REPORT_CACHE_SIZE = 2048       # analysed program shapes kept in memory
+
+STDIN_BLOBS = StdinBlobStore(
+    os.path.join(settings.DEVETRYX_DATA_DIR, "stdin"),
+    max_entries=100,
+    max_bytes=512 * 1024 * 1024
+)
+
+# =========================================================
+# COMPILED LANGUAGES
+# =========================================================
+
+COMPILED_LANGUAGES = {
+    "c": {
+        "compiler": "gcc",
+        "sources": (".c",),
+        "flags": ["-O2", "-std=c17", "-pipe"],
+        "libs": ["-lm"],
+    },
+    "cpp": {
+        "compiler": "g++",
+        "sources": (".cpp", ".cc", ".cxx"),
+        "flags": ["-O2", "-std=c++17", "-pipe"],
+        "libs": [],
+    },
+}
+
+UNSAFE_NATIVE_HEADERS = {
+    "unistd.h", "fcntl.h", "dirent.h", "dlfcn.h", "spawn.h",
+    "pthread.h", "thread", "filesystem", "windows.h",
+    "sys/socket.h", "sys/mman.h", "sys/ptrace.h", "sys/syscall.h",
+    "sys/wait.h", "netinet/in.h", "arpa/inet.h", "netdb.h"
+}
+
+NATIVE_INCLUDE = re.compile(r'#\s*(?:include|include_next|import)\s*[<"]([^>"]+)[>"]')
+
+UNSAFE_NATIVE_FUNCTIONS = {
+    "system", "popen", "fork", "vfork", "execl", "execlp", "execle",
+    "execv", "execvp", "execve", "syscall", "dlopen", "kill",
+    "socket", "ptrace", "mmap", "asm", "__asm__"
+}
+
 # =========================================================
 # SAFE MODULES
 # =========================================================
@@ -61,17 +142,83 @@ def limit_resources():
     if not IS_LINUX:
         return  # Windows does not support resource limits
 
-    resource.setrlimit(resource.RLIMIT_CPU, (5, 5))
+    resource.setrlimit(resource.RLIMIT_CPU, (MAX_CPU_SECONDS, MAX_CPU_SECONDS))
+    resource.setrlimit(
+        resource.RLIMIT_AS,
+        (MAX_MEMORY_MB * 1024 * 1024,) * 2
+    )
+
+def limit_profiled_resources():
+    # Memory mode: tracemalloc slows every allocation and the traces are
+    # copied on top of the heap. memprofile enforces MAX_MEMORY_MB itself,
+    # and writes its report on SIGXCPU, before the hard CPU limit.
+    cpu = MAX_CPU_SECONDS + PROFILER_CPU_HEADROOM
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 5))
+    resource.setrlimit(
+        resource.RLIMIT_AS,
+        ((MAX_MEMORY_MB + PROFILER_MEMORY_HEADROOM_MB) * 1024 * 1024,) * 2
+    )
+
+def limit_fast_path_worker():
+    # Long-lived worker: memory only, CPU is limited per job in fastpath.py
     resource.setrlimit(
         resource.RLIMIT_AS,
-        (256 * 1024 * 1024,) * 2
+        (MAX_MEMORY_MB * 1024 * 1024,) * 2
+    )
+
+PR_SET_NO_NEW_PRIVS = 38
+
+def sandbox_user():
+    # Native programs never run as root; "nobody" when the server is root
+    if not IS_LINUX or os.geteuid() != 0:
+        return None
+    try:
+        return pwd.getpwnam("nobody").pw_uid
+    except KeyError:
+        return 65534
+
+SANDBOX_UID = sandbox_user()
+
+def limit_native_resources():
+    # Runs after Popen has switched to SANDBOX_UID; raising RLIMIT_NPROC
+    # to 0 before that would make the exec itself fail with EAGAIN.
+    limit_resources()
+
+    # No fork/system/popen, no setuid binaries, bounded file writes
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    resource.setrlimit(
+        resource.RLIMIT_FSIZE,
+        (NATIVE_FILE_SIZE_MB * 1024 * 1024,) * 2
+    )
+    if ctypes.CDLL(None, use_errno=True).prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), "prctl(PR_SET_NO_NEW_PRIVS) failed")
+
+def limit_compiler_resources():
+    if not IS_LINUX:
+        return
+
+    resource.setrlimit(resource.RLIMIT_CPU, (COMPILE_TIMEOUT, COMPILE_TIMEOUT))
+    resource.setrlimit(
+        resource.RLIMIT_AS,
+        (COMPILER_MEMORY_MB * 1024 * 1024,) * 2
     )
 
 # =========================================================
 # AST SECURITY CHECK
 # =========================================================
 
-def is_safe_import(code: str) -> bool:
+def local_modules(files: dict) -> frozenset:
+    """Module names a multi-file submission may import from itself.
+
+    Never a stdlib, builtin or unsafe name: a submitted ``os.py`` must not
+    unlock ``import os``, which would load the real module.
+    """
+    names = {name[:-3] for name in files if name.endswith(".py")}
+    return frozenset(
+        names - UNSAFE_NAMES - set(sys.stdlib_module_names) - set(sys.builtin_module_names)
+    )
+
+def is_safe_import(code: str, allowed_local=frozenset()) -> bool:
     try:
         tree = ast.parse(code)
     except SyntaxError:
@@ -89,17 +236,203 @@ def is_safe_import(code: str) -> bool:
         if isinstance(node, ast.Import):
             for alias in node.names:
                 root = alias.name.split(".")[0]
-                if root in UNSAFE_NAMES or root not in SAFE_MODULES:
+                if root in UNSAFE_NAMES or root not in SAFE_MODULES | allowed_local:
                     return False
 
         if isinstance(node, ast.ImportFrom):
             if node.module:
                 root = node.module.split(".")[0]
-                if root in UNSAFE_NAMES or root not in SAFE_MODULES:
+                if root in UNSAFE_NAMES or root not in SAFE_MODULES | allowed_local:
                     return False
 
     return True
 
+# =========================================================
+# FAST PATH CHECK
+# =========================================================
+
+FAST_PATH_POOL = FastPathPool(
+    FAST_PATH_WORKERS,
+    preexec_fn=limit_fast_path_worker if IS_LINUX else None,
+    timeout=FAST_PATH_TIMEOUT
+)
+
+# Methods of the builtin types that fast-path snippets may call
+FAST_PATH_ATTRIBUTES = frozenset({
+    # str
+    "capitalize", "center", "count", "endswith", "find", "format", "index",
+    "isalnum", "isalpha", "isdigit", "islower", "isnumeric", "isspace",
+    "istitle", "isupper", "join", "ljust", "lower", "lstrip", "partition",
+    "replace", "rfind", "rindex", "rjust", "rpartition", "rsplit", "rstrip",
+    "split", "splitlines", "startswith", "strip", "swapcase", "title",
+    "upper", "zfill",
+    # list / dict / set
+    "append", "clear", "copy", "extend", "insert", "pop", "remove",
+    "reverse", "sort", "get", "items", "keys", "values", "setdefault",
+    "update", "popitem", "fromkeys", "add", "discard", "difference",
+    "intersection", "union", "symmetric_difference", "issubset",
+    "issuperset", "isdisjoint",
+    # numbers
+    "bit_length", "conjugate", "imag", "real", "is_integer",
+    "denominator", "numerator",
+})
+
+# Attribute names of interpreter internals (frames, code, generators,
+# tracebacks, functions, classes). A snippet may never use these, not even
+# as names of its own attributes, so nothing can walk out of its sandbox.
+# Whitelisted method names stay usable: with every path to an internal
+# object blocked, `code.replace` or `frame.clear` cannot be reached.
+FAST_PATH_INTERNAL_ATTRIBUTES = frozenset(
+    name
+    for kind in (
+        types.FrameType, types.CodeType, types.TracebackType,
+        types.GeneratorType, types.CoroutineType, types.AsyncGeneratorType,
+        types.FunctionType, types.MethodType, types.BuiltinFunctionType,
+        types.ModuleType, type, object,
+    )
+    for name in dir(kind)
+) - FAST_PATH_ATTRIBUTES
+
+def format_fields_are_plain(text: str) -> bool:
+    # "{0.gi_frame}".format(x) reads attributes without an ast.Attribute
+    try:
+        fields = list(string.Formatter().parse(text))
+    except ValueError:
+        return False
+
+    for _, field, spec, _ in fields:
+        if field and ("." in field or "[" in field):
+            return False
+        if spec and "{" in spec and not format_fields_are_plain(spec):
+            return False
+    return True
+
+def is_fast_path_eligible(files: dict, main_file: str) -> bool:
+    if len(files) != 1:
+        return False
+
+    try:
+        tree = ast.parse(files[main_file])
+    except SyntaxError:
+        return False
+
+    defined = set()
+    loaded = set()
+    attributes = set()
+    own_attributes = set()
+
+    for node in ast.walk(tree):
+
+        # No imports, scope tricks, async or pattern matching
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.Global, ast.Nonlocal,
+                             ast.AsyncFunctionDef, ast.Await, ast.Match)):
+            return False
+
+        # A bare except could swallow the line budget's BaseException
+        if isinstance(node, ast.ExceptHandler) and node.type is None:
+            return False
+
+        # Attributes: builtin-type methods or the snippet's own, never internals
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith("_") or node.attr in FAST_PATH_INTERNAL_ATTRIBUTES:
+                return False
+            if isinstance(node.ctx, ast.Store):
+                own_attributes.add(node.attr)
+            else:
+                attributes.add(node.attr)
+
+            # str.format only on literals, whose fields are checked below
+            if node.attr == "format" and not (
+                isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)
+            ):
+                return False
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if "__" in node.value or not format_fields_are_plain(node.value):
+                return False
+
+        if isinstance(node, ast.Name):
+            if node.id.startswith("__"):
+                return False
+            if isinstance(node.ctx, ast.Load):
+                loaded.add(node.id)
+            else:
+                defined.add(node.id)
+        elif isinstance(node, ast.ClassDef):
+            defined.add(node.name)
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef):
+                    own_attributes.add(item.name)
+                elif isinstance(item, (ast.Assign, ast.AnnAssign)):
+                    targets = item.targets if isinstance(item, ast.Assign) else [item.target]
+                    own_attributes.update(t.id for t in targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.FunctionDef):
+            defined.add(node.name)
+        elif isinstance(node, ast.arg):
+            defined.add(node.arg)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            defined.add(node.name)
+
+    # Every name must be the user's own or a restricted builtin
+    if not loaded <= defined | FAST_PATH_BUILTINS:
+        return False
+    return attributes <= own_attributes | FAST_PATH_ATTRIBUTES
+
+def run_fast_path(files: dict, main_file: str, user_input=""):
+    # Spooled stdin files always go to the sandbox as a real fd
+    if not isinstance(user_input, str):
+        return None
+    if not FAST_PATH_ENABLED or not is_fast_path_eligible(files, main_file):
+        return None
+
+    result = FAST_PATH_POOL.run({
+        "code": files[main_file],
+        "filename": main_file,
+        "input": (user_input + "\n").splitlines() if user_input else [],
+        "max_lines": FAST_PATH_MAX_LINES,
+        "max_seconds": FAST_PATH_TIMEOUT / 2,
+        "max_output": MAX_OUTPUT_SIZE,
+    })
+    if result is None:
+        return None
+
+    return {"stdout": result["stdout"], "stderr": result["stderr"]}
+
+# =========================================================
+# FILE NAME CHECK
+# =========================================================
+
+# Plain names only: no path separators, no leading "-" or "."
+SAFE_FILE_NAME = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.-]*")
+
+def is_safe_filename(name) -> bool:
+    return isinstance(name, str) and SAFE_FILE_NAME.fullmatch(name) is not None
+
+# =========================================================
+# NATIVE SECURITY CHECK
+# =========================================================
+
+def is_safe_native(code: str) -> bool:
+    """Early, friendly rejection of obviously unsafe native code.
+
+    A regex cannot really vet C (function pointers, asm, macros get past
+    it). The enforcement is limit_native_resources and SANDBOX_UID, for
+    the compiler as well as the program.
+    """
+    for header in NATIVE_INCLUDE.findall(code):
+        header = header.strip().replace("\\", "/")
+        if header in UNSAFE_NATIVE_HEADERS:
+            return False
+        # Only the system headers and the submission's own files
+        if header.startswith("/") or ".." in header.split("/"):
+            return False
+
+    for name in re.findall(r'\b([A-Za-z_]\w*)\s*\(', code):
+        if name in UNSAFE_NATIVE_FUNCTIONS:
+            return False
+
+    return True
+
 # =========================================================
 # SYNTAX CHECK
 # =========================================================
@@ -117,6 +450,60 @@ def syntax_check(path):
 
 INJECTED_LINES = 2  # lines added before user code
 
+TRACEBACK_LINE = re.compile(r'File ".*?", line (\d+)')
+
+# Agent-style explanations
+AGENT_EXPLANATIONS = {
+    "NameError": {
+        "what": lambda m: f"You tried to use `{extract_name(m)}` but Python does not know what it is.",
+        "why": "Python reads code from top to bottom. If a variable is used before being created, this error happens.",
+        "fix": "Define the variable before using it, or check for spelling mistakes.",
+        "try": "Can you find where this variable should be created?"
+    },
+    "ZeroDivisionError": {
+        "what": lambda _: "Your code tried to divide a number by zero.",
+        "why": "Division by zero is mathematically undefined.",
+        "fix": "Check the divisor before dividing.",
+        "try": "What value is becoming zero here?"
+    },
+    "IndexError": {
+        "what": lambda _: "You accessed a list position that does not exist.",
+        "why": "Lists have a fixed size. Indexing beyond it causes this error.",
+        "fix": "Check the list length or loop bounds.",
+        "try": "How many elements does your list actually have?"
+    },
+    "TypeError": {
+        "what": lambda _: "An operation was applied to incompatible data types.",
+        "why": "Some operations only work with specific data types.",
+        "fix": "Print the variable types using `type()`.",
+        "try": "What data types are involved here?"
+    },
+    "SyntaxError": {
+        "what": lambda _: "Python could not understand this line of code.",
+        "why": "There is a syntax rule violation.",
+        "fix": "Look for missing colons, brackets, or typos.",
+        "try": "Does this line follow Python’s syntax rules?"
+    },
+    "IndentationError": {
+        "what": lambda _: "Your code indentation is inconsistent.",
+        "why": "Python uses indentation to define blocks.",
+        "fix": "Align spaces consistently.",
+        "try": "Are all lines under this block aligned?"
+    },
+    "KeyError": {
+        "what": lambda m: f"You tried to access a dictionary key `{extract_name(m)}` that does not exist.",
+        "why": "Dictionaries raise an error when a key is missing.",
+        "fix": "Check if the key exists before accessing it.",
+        "try": "What keys does this dictionary contain?"
+    },
+    "MemoryError": {
+        "what": lambda _: f"Your program used more than the {MAX_MEMORY_MB} MB memory limit.",
+        "why": "Every item in a list, dict or string stays in memory until it is no longer used.",
+        "fix": "Process data one item at a time with loops, generators or iterators instead of building huge lists.",
+        "try": "Run the program in memory mode to see which line uses the most memory."
+    },
+}
+
 def explain_error(stderr: str, user_code: str | None = None) -> str:
     if not stderr:
         return ""
@@ -127,7 +514,7 @@ def explain_error(stderr: str, user_code: str | None = None) -> str:
     # Extract traceback line number
     # --------------------------------------------------
     line_no = None
-    matches = re.findall(r'File ".*?", line (\d+)', stderr)
+    matches = TRACEBACK_LINE.findall(stderr)
     if matches:
         raw_line = int(matches[-1])
         line_no = max(1, raw_line - INJECTED_LINES)
@@ -135,8 +522,8 @@ def explain_error(stderr: str, user_code: str | None = None) -> str:
     # --------------------------------------------------
     # Extract error type & message
     # --------------------------------------------------
-    lines = [l for l in stderr.splitlines() if l.strip()]
-    last_line = lines[-1] if lines else stderr
+    # stderr is stripped, so its last line is never blank
+    last_line = stderr.rsplit("\n", 1)[-1]
 
     if ":" in last_line:
         error_type, error_msg = last_line.split(":", 1)
@@ -146,54 +533,6 @@ def explain_error(stderr: str, user_code: str | None = None) -> str:
         error_type = last_line.strip()
         error_msg = ""
 
-    # --------------------------------------------------
-    # Agent-style explanations
-    # --------------------------------------------------
-    AGENT_EXPLANATIONS = {
-        "NameError": {
-            "what": lambda m: f"You tried to use `{extract_name(m)}` but Python does not know what it is.",
-            "why": "Python reads code from top to bottom. If a variable is used before being created, this error happens.",
-            "fix": "Define the variable before using it, or check for spelling mistakes.",
-            "try": "Can you find where this variable should be created?"
-        },
-        "ZeroDivisionError": {
-            "what": lambda _: "Your code tried to divide a number by zero.",
-            "why": "Division by zero is mathematically undefined.",
-            "fix": "Check the divisor before dividing.",
-            "try": "What value is becoming zero here?"
-        },
-        "IndexError": {
-            "what": lambda _: "You accessed a list position that does not exist.",
-            "why": "Lists have a fixed size. Indexing beyond it causes this error.",
-            "fix": "Check the list length or loop bounds.",
-            "try": "How many elements does your list actually have?"
-        },
-        "TypeError": {
-            "what": lambda _: "An operation was applied to incompatible data types.",
-            "why": "Some operations only work with specific data types.",
-            "fix": "Print the variable types using `type()`.",
-            "try": "What data types are involved here?"
-        },
-        "SyntaxError": {
-            "what": lambda _: "Python could not understand this line of code.",
-            "why": "There is a syntax rule violation.",
-            "fix": "Look for missing colons, brackets, or typos.",
-            "try": "Does this line follow Python’s syntax rules?"
-        },
-        "IndentationError": {
-            "what": lambda _: "Your code indentation is inconsistent.",
-            "why": "Python uses indentation to define blocks.",
-            "fix": "Align spaces consistently.",
-            "try": "Are all lines under this block aligned?"
-        },
-        "KeyError": {
-            "what": lambda m: f"You tried to access a dictionary key `{extract_name(m)}` that does not exist.",
-            "why": "Dictionaries raise an error when a key is missing.",
-            "fix": "Check if the key exists before accessing it.",
-            "try": "What keys does this dictionary contain?"
-        },
-    }
-
     # --------------------------------------------------
     # Build response
     # --------------------------------------------------
@@ -244,6 +583,71 @@ def contact_submit(request):
 def python_compiler(request):
     return render(request, "compilers/python.html")
 
+def progress(request):
+    learner_key = learner_key_for(request)
+    if learner_key is None:
+        return JsonResponse({"runs": 0})
+    return JsonResponse(get_progress_summary(learner_key))
+
+# =========================================================
+# STDIN INPUT
+# =========================================================
+
+def read_run_request(request):
+    """Return ``(payload, user_input, stdin_bytes)`` for a run request.
+
+    JSON bodies carry stdin as the ``user_input`` string. Multipart bodies
+    carry the JSON as a ``payload`` field and stdin as a ``stdin`` file.
+    Either may name a ``stdin_blob`` from ``upload_stdin`` instead. File
+    input is returned as an open binary file for ``run_sandboxed``.
+    """
+    if not request.content_type.startswith("multipart/"):
+        payload = json.loads(request.body)
+        upload = None
+    else:
+        limit = StdinLimitHandler(MAX_STDIN_BYTES, request)
+        request.upload_handlers.insert(0, limit)
+        payload = json.loads(request.POST.get("payload", "{}"))
+        if limit.exceeded:
+            raise StdinRejected(f"Input is larger than {format_bytes(MAX_STDIN_BYTES)}")
+        upload = request.FILES.get("stdin")
+
+    if upload is not None:
+        return payload, spool_upload(upload), upload.size
+
+    if payload.get("stdin_blob"):
+        blob = STDIN_BLOBS.open(str(payload["stdin_blob"]))
+        if blob is None:
+            raise StdinRejected("Input file not found, please upload it again")
+        return payload, blob, os.fstat(blob.fileno()).st_size
+
+    user_input = payload.get("user_input", "")
+    return payload, user_input, len(user_input.encode("utf-8"))
+
+def close_input(user_input):
+    if not isinstance(user_input, str):
+        user_input.close()
+
+@csrf_exempt
+def upload_stdin(request):
+
+    if request.method != "POST":
+        return JsonResponse({"output": "Invalid request"}, status=405)
+
+    limit = StdinLimitHandler(MAX_STDIN_BYTES, request)
+    request.upload_handlers.insert(0, limit)
+    upload = request.FILES.get("stdin")
+
+    if limit.exceeded:
+        return JsonResponse(
+            {"output": f"Input is larger than {format_bytes(MAX_STDIN_BYTES)}"},
+            status=413
+        )
+    if upload is None:
+        return JsonResponse({"output": "No stdin file uploaded"}, status=400)
+
+    return JsonResponse({"blob": STDIN_BLOBS.store_upload(upload), "bytes": upload.size})
+
 # =========================================================
 # PYTHON EXECUTOR
 # =========================================================
@@ -253,29 +657,37 @@ def run_python_code(request):
     if request.method != "POST":
         return JsonResponse({"output": "Invalid request"}, status=405)
 
+    user_input = ""
     try:
-        payload = json.loads(request.body)
+        payload, user_input, stdin_bytes = read_run_request(request)
         files = payload.get("files", {})
         main_file = payload.get("main_file")
         mode = payload.get("mode", "compiler")
-        user_input = payload.get("user_input", "")
 
         if main_file not in files:
             return JsonResponse({"output": "Main file missing"})
 
+        if not all(is_safe_filename(name) for name in files):
+            return JsonResponse({"output": "❌ Invalid file name"})
+
         # ---------------- SECURITY CHECK ----------------
+        allowed_local = local_modules(files)
         for code in files.values():
-            if not is_safe_import(code):
+            if not is_safe_import(code, allowed_local):
                 return JsonResponse({"output": "❌ Unsafe code detected"})
 
         # ---------------- EXECUTION ENGINE ----------------
-        execution_result = execute_python(files, main_file, user_input)
+        execution_result = execute_python(
+            files, main_file, user_input,
+            trace=(mode == "trace"),
+            memory=(mode == "memory")
+        )
 
         stdout = execution_result["stdout"]
         stderr = execution_result["stderr"]
 
         # Attach user input into output (so it looks natural)
-        if user_input:
+        if isinstance(user_input, str) and user_input:
             stdout = stdout.replace(
                 "Enter the maximum number:",
                 f"Enter the maximum number: {user_input}"
@@ -284,10 +696,29 @@ def run_python_code(request):
         if "EOFError" in stderr:
             return JsonResponse({
                 "output": stdout,
+                "stdin_bytes": stdin_bytes,
                 "waiting_for_input": True
             })
 
         # ---------------- NORMAL EXECUTION ----------------
+        if mode == "trace":
+            return JsonResponse({
+                "output": stderr if stderr else stdout,
+                "trace": execution_result.get("trace"),
+                "stdin_bytes": stdin_bytes,
+                "waiting_for_input": False
+            })
+
+        if mode == "memory":
+            return JsonResponse({
+                "output": memory_report(
+                    execution_result.get("memory"), files, main_file, stdout, stderr
+                ),
+                "memory": execution_result.get("memory"),
+                "stdin_bytes": stdin_bytes,
+                "waiting_for_input": False
+            })
+
         if mode == "compiler":
             output = stderr if stderr else stdout
         else:
@@ -296,11 +727,19 @@ def run_python_code(request):
                 mode=mode,
                 code=files[main_file],
                 stdout=stdout,
-                stderr=stderr
+                stderr=stderr,
+                request=request
             )
 
         return JsonResponse({
             "output": output,
+            "stdin_bytes": stdin_bytes,
+            "waiting_for_input": False
+        })
+
+    except StdinRejected as e:
+        return JsonResponse({
+            "output": f"❌ {e}",
             "waiting_for_input": False
         })
 
@@ -316,18 +755,136 @@ def run_python_code(request):
             "waiting_for_input": False
         })
 
-def execute_python(files: dict, main_file: str, user_input=""):
+    finally:
+        close_input(user_input)
+
+def run_sandboxed(command: list, workspace: str, user_input="", native=False,
+                  limits=None):
+    # A spooled stdin file is handed over as the child's fd, not piped
+    piped = isinstance(user_input, str)
+
+    if limits is None:
+        limits = limit_native_resources if native else limit_resources
+    user = {}
+    if native and SANDBOX_UID is not None:
+        user = {"user": SANDBOX_UID, "group": SANDBOX_UID, "extra_groups": []}
+
+    try:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if piped else user_input,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=workspace,
+            text=True,
+            preexec_fn=limits if IS_LINUX else None,
+            **user
+        )
+
+        if piped and user_input:
+            process.stdin.write(user_input + "\n")
+            process.stdin.flush()
+
+        try:
+            stdout, stderr = process.communicate(timeout=EXECUTION_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            return {
+                "stdout": "",
+                "stderr": "⏱ Execution timed out"
+            }
+    except Exception as e:
+        return {"stdout": "", "stderr": str(e)}
+
+    return {
+        "stdout": stdout[:MAX_OUTPUT_SIZE],
+        "stderr": stderr,
+        "returncode": process.returncode
+    }
+
+def memory_prelude(report_path: str) -> str:
+    # Exactly INJECTED_LINES lines, so error line numbers stay correct
+    return (
+        f"__import__('sys').path.append({CORE_DIR!r})\n"
+        f"__import__('memprofile').start({report_path!r}, __file__, {INJECTED_LINES}, "
+        f"{MAX_MEMORY_MB * 1024 * 1024})\n"
+    )
+
+@csrf_exempt
+def run_compiled_code(request, language):
+
+    if request.method != "POST":
+        return JsonResponse({"output": "Invalid request"}, status=405)
+
+    user_input = ""
+    try:
+        payload, user_input, stdin_bytes = read_run_request(request)
+        files = payload.get("files", {})
+        main_file = payload.get("main_file")
+
+        if main_file not in files:
+            return JsonResponse({"output": "Main file missing"})
+
+        if not all(is_safe_filename(name) for name in files):
+            return JsonResponse({"output": "❌ Invalid file name"})
+
+        # ---------------- SECURITY CHECK ----------------
+        for code in files.values():
+            if not is_safe_native(code):
+                return JsonResponse({"output": "❌ Unsafe code detected"})
+
+        # ---------------- BUILD + EXECUTION ----------------
+        result = execute_compiled(files, main_file, language, user_input)
+
+        return JsonResponse({
+            "output": result["stderr"] if result["stderr"] else result["stdout"],
+            "cached": result["cached"],
+            "stdin_bytes": stdin_bytes,
+            "waiting_for_input": False
+        })
+
+    except StdinRejected as e:
+        return JsonResponse({
+            "output": f"❌ {e}",
+            "waiting_for_input": False
+        })
+
+    except Exception as e:
+        return JsonResponse({
+            "output": f"Internal error: {str(e)}",
+            "waiting_for_input": False
+        })
+
+    finally:
+        close_input(user_input)
+
+def execute_python(files: dict, main_file: str, user_input="", trace=False,
+                   memory=False, fast_path=True):
+
+    # Trivial import-free snippets skip interpreter start-up entirely
+    if fast_path and not (trace or memory):
+        result = run_fast_path(files, main_file, user_input)
+        if result is not None:
+            return result
+
+    if not all(is_safe_filename(name) for name in files):
+        return {"stdout": "", "stderr": "Invalid file name"}
 
     with tempfile.TemporaryDirectory() as root:
         workspace = os.path.join(root, str(uuid.uuid4()))
         os.mkdir(workspace)
 
         file_paths = {}
+        trace_path = os.path.join(root, "trace.json")
+        memory_path = os.path.join(root, "memory.json")
 
         # Write files
         for name, content in files.items():
             path = os.path.join(workspace, name)
 
+            if memory and name == main_file:
+                content = memory_prelude(memory_path) + content
+
             with open(path, "w", encoding="utf-8") as f:
                 f.write(content)
 
@@ -337,39 +894,126 @@ def execute_python(files: dict, main_file: str, user_input=""):
             if err:
                 return {"stdout": "", "stderr": err}
 
-        # Run main file
-        try:
-            process = subprocess.Popen(
-                [sys.executable, file_paths[main_file]],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=workspace,
-                text=True,
-                preexec_fn=limit_resources if IS_LINUX else None
-            )
+        # Run main file (through the step tracer in trace mode)
+        command = [sys.executable, file_paths[main_file]]
+        if trace:
+            command = [
+                sys.executable, TRACER_SCRIPT, trace_path, file_paths[main_file],
+                str(TRACE_MAX_STEPS), str(TRACE_MAX_BYTES), str(TRACE_SAMPLE_EVERY)
+            ]
+
+        limits = limit_profiled_resources if memory else None
+        result = run_sandboxed(command, workspace, user_input, limits=limits)
+
+        if trace and os.path.exists(trace_path):
+            with open(trace_path, encoding="utf-8") as f:
+                result["trace"] = json.load(f)
+
+        if memory and os.path.exists(memory_path):
+            with open(memory_path, encoding="utf-8") as f:
+                result["memory"] = json.load(f)
+
+        return result
+
+# =========================================================
+# COMPILED LANGUAGE EXECUTOR
+# =========================================================
+
+@functools.lru_cache(maxsize=None)
+def compiler_identity(compiler: str):
+    path = shutil.which(compiler)
+    if path is None:
+        return None
 
-            if user_input:
-                process.stdin.write(user_input + "\n")
-                process.stdin.flush()
+    version = subprocess.run(
+        [path, "-dumpfullversion", "-dumpversion"],
+        capture_output=True, text=True
+    ).stdout.strip()
+    return f"{path} {version}"
 
+def build_key(identity: str, spec: dict, files: dict) -> str:
+    digest = hashlib.sha256(identity.encode())
+    digest.update("\0".join(spec["flags"] + spec["libs"]).encode())
+
+    for name in sorted(files):
+        digest.update(f"\0{name}\0{files[name]}".encode())
+
+    return digest.hexdigest()
+
+def execute_compiled(files: dict, main_file: str, language: str, user_input=""):
+    spec = COMPILED_LANGUAGES[language]
+    identity = compiler_identity(spec["compiler"])
+    if identity is None:
+        return {
+            "stdout": "",
+            "stderr": f"{spec['compiler']} is not available on this server",
+            "cached": False
+        }
+
+    if not all(is_safe_filename(name) for name in files):
+        return {"stdout": "", "stderr": "Invalid file name", "cached": False}
+
+    with tempfile.TemporaryDirectory() as root:
+        workspace = os.path.join(root, str(uuid.uuid4()))
+        os.mkdir(workspace)
+        build_dir = os.path.join(root, "build")
+        os.mkdir(build_dir)
+
+        for name, content in files.items():
+            with open(os.path.join(workspace, name), "w", encoding="utf-8") as f:
+                f.write(content)
+
+        user = {}
+        if SANDBOX_UID is not None:
+            # Compiler and program both run as SANDBOX_UID: they may reach
+            # their own workspace and build dir, nothing else under root
+            # (so #include cannot read server files either)
+            os.chmod(root, 0o711)
+            for path in [workspace, build_dir, *(os.path.join(workspace, name) for name in files)]:
+                os.chown(path, SANDBOX_UID, SANDBOX_UID)
+            user = {"user": SANDBOX_UID, "group": SANDBOX_UID, "extra_groups": []}
+
+        # Build outside the workspace; unchanged code skips the compiler
+        binary = os.path.join(build_dir, "program.exe" if os.name == "nt" else "program")
+        key = build_key(identity, spec, files)
+        cached = BUILD_CACHE.fetch(key, binary)
+
+        if not cached:
+            # "./" keeps gcc from reading a file name as an option
+            sources = [f"./{name}" for name in files if name.endswith(spec["sources"])]
             try:
-                stdout, stderr = process.communicate(timeout=EXECUTION_TIMEOUT)
+                build = subprocess.run(
+                    [spec["compiler"], *spec["flags"], *sources, "-o", binary, *spec["libs"]],
+                    cwd=workspace,
+                    capture_output=True,
+                    text=True,
+                    timeout=COMPILE_TIMEOUT,
+                    preexec_fn=limit_compiler_resources if IS_LINUX else None,
+                    **user
+                )
             except subprocess.TimeoutExpired:
-                process.kill()
+                return {"stdout": "", "stderr": "⏱ Compilation timed out", "cached": False}
+
+            if build.returncode != 0:
                 return {
                     "stdout": "",
-                    "stderr": "⏱ Execution timed out"
+                    "stderr": build.stderr[:MAX_OUTPUT_SIZE],
+                    "cached": False
                 }
-        except Exception as e:
-            return {"stdout": "", "stderr": str(e)}
 
-        return {
-            "stdout": stdout[:MAX_OUTPUT_SIZE],
-            "stderr": stderr
-        }
+            BUILD_CACHE.store(key, binary)
+
+        result = run_sandboxed([binary], workspace, user_input, native=True)
+        result["cached"] = cached
 
-def intelligence_router(mode, code, stdout, stderr):
+        returncode = result.get("returncode", 0)
+        if returncode < 0:
+            note = f"Program terminated by {signal.Signals(-returncode).name}"
+            result["stderr"] = "\n".join(filter(None, [result["stderr"], note]))
+
+        return result
+
+def intelligence_router(mode, code, stdout, stderr, request=None):
 
     if mode == "compiler":
         return stderr if stderr else stdout
@@ -377,16 +1021,23 @@ def intelligence_router(mode, code, stdout, stderr):
     if stderr:
         return explain_error(stderr, code)
 
-    analysis = advanced_code_analysis(code) or {}
-
-    if mode == "mentor":
-        return generate_personalized_feedback(analysis, stdout)
-
-    if mode == "analyzer":
-        return generate_personalized_feedback(analysis, stdout)
+    # Same-shaped submissions reuse the analysis and report templates
+    analysis, entry = cached_analysis(code)
+
+    if mode in ("mentor", "analyzer"):
+        profile = trend = None
+        if request is not None:
+            # Only these modes record a run, so only they may start a session
+            score = calculate_skill_score(analysis)
+            profile, trend = record_skill_run(
+                learner_key_for(request, create=True), mode, analysis, score,
+                detect_level(score)
+            )
+        template = cached_report(entry, "feedback", feedback_template, analysis)
+        return generate_personalized_feedback(analysis, stdout, profile, template, trend)
 
     if mode == "challenge":
-        return generate_challenge(analysis)
+        return cached_report(entry, "challenge", generate_challenge, analysis)
 
     if mode == "explain":
         return explain_logic(code)
@@ -513,23 +1164,114 @@ def challenge_mode(code, stdout, stderr):
 
     return "\n".join(response)
 
+# =========================================================
+# MEMORY ANALYSIS
+# =========================================================
+
+def format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+def memory_suggestions(report: dict, files: dict) -> list:
+    suggestions = []
+    trees = {}
+    dominant = max(LARGE_ALLOCATION, report["peak"] // 4)
+
+    for site in report["top_lines"]:
+        if site["size"] < dominant or site["file"] not in files:
+            continue
+
+        if site["file"] not in trees:
+            try:
+                trees[site["file"]] = ast.parse(files[site["file"]])
+            except SyntaxError:
+                trees[site["file"]] = None
+        if trees[site["file"]] is None:
+            continue
+
+        line = site["line"]
+        nodes = [
+            n for n in ast.walk(trees[site["file"]])
+            if getattr(n, "lineno", None) == line
+        ]
+        calls = [n for n in nodes if isinstance(n, ast.Call)]
+
+        if any(isinstance(n, ast.ListComp) for n in nodes):
+            suggestions.append(
+                f"- Line {line}: this list comprehension keeps every item in memory. "
+                "If you only loop over it once, use a generator expression `(...)` instead of `[...]`."
+            )
+        elif any(isinstance(c.func, ast.Name) and c.func.id in ("list", "sorted") for c in calls):
+            suggestions.append(
+                f"- Line {line}: `list()` copies the whole sequence into memory. "
+                "Loop over the original iterator directly instead."
+            )
+        elif any(isinstance(c.func, ast.Attribute) and c.func.attr in ("read", "readlines") for c in calls):
+            suggestions.append(
+                f"- Line {line}: reading the whole file at once is expensive. "
+                "Iterate over the file object to handle one line at a time."
+            )
+        elif any(isinstance(c.func, ast.Attribute) and c.func.attr == "append" for c in calls):
+            suggestions.append(
+                f"- Line {line}: this list keeps growing with `.append()`. "
+                "Consider a generator function that `yield`s each item instead."
+            )
+
+    return suggestions
+
+def memory_report(report, files: dict, main_file: str, stdout: str, stderr: str) -> str:
+    response = ["🧮 Memory Report\n"]
+
+    if stderr:
+        response.append(explain_error(stderr, files[main_file]) + "\n")
+
+    if report:
+        response.extend(memory_sections(report, files))
+    else:
+        response.append("Memory usage could not be measured for this run.")
+
+    # The program's own output is shown even when no report was written
+    response.append("\n📤 Program Output:")
+    response.append(stdout[:3000])
+
+    return "\n".join(response)
+
+def memory_sections(report: dict, files: dict) -> list:
+    response = [
+        f"📈 Peak memory: {format_bytes(report['peak'])} (limit {MAX_MEMORY_MB} MB)\n"
+    ]
+
+    if report["top_lines"]:
+        response.append("📍 Top allocation sites:")
+        for site in report["top_lines"][:5]:
+            response.append(
+                f"- {site['file']} line {site['line']}: "
+                f"{format_bytes(site['size'])} in {site['count']} blocks"
+            )
+
+    if report["growth"]:
+        response.append("\n📊 Growth between snapshots:")
+        for interval in report["growth"]:
+            site = interval["lines"][0]
+            response.append(
+                f"- {interval['from']:.1f}s → {interval['to']:.1f}s: "
+                f"+{format_bytes(site['delta'])} at {site['file']} line {site['line']}"
+            )
+
+    suggestions = memory_suggestions(report, files)
+    if suggestions:
+        response.append("\n💡 Save memory:")
+        response.extend(suggestions)
+
+    return response
+
 # =========================================================
 # INTELLIGENCE ENGINE
 # =========================================================
 def advanced_code_analysis(code: str):
-    analysis = {
-        "functions": [],
-        "loops": 0,
-        "nested_loop_depth": 0,
-        "conditions": 0,
-        "recursion": False,
-        "list_comp": 0,
-        "variables": set(),
-        "used_variables": set(),
-        "cyclomatic_complexity": 1,
-        "unused_variables": []
-    }
-
     try:
         tree = ast.parse(code)
     except Exception:
@@ -545,6 +1287,23 @@ def advanced_code_analysis(code: str):
             "cyclomatic_complexity": 1,
             "unused_variables": []
         }
+
+    return analyze_tree(tree)
+
+def analyze_tree(tree: ast.AST):
+    analysis = {
+        "functions": [],
+        "loops": 0,
+        "nested_loop_depth": 0,
+        "conditions": 0,
+        "recursion": False,
+        "list_comp": 0,
+        "variables": set(),
+        "used_variables": set(),
+        "cyclomatic_complexity": 1,
+        "unused_variables": []
+    }
+
     loop_stack = 0
     max_loop_depth = 0
 
@@ -591,6 +1350,78 @@ def advanced_code_analysis(code: str):
     )
 
     return analysis
+
+# =========================================================
+# REPORT CACHE
+# =========================================================
+
+REPORT_CACHE = ReportCache(REPORT_CACHE_SIZE)     # shape key -> analysis + reports
+SOURCE_CACHE = ReportCache(REPORT_CACHE_SIZE)     # source hash -> (shape key, names)
+
+def shape_analysis(analysis: dict, names: list) -> dict:
+    # Replace identifiers by their fingerprint numbers
+    index = {name: i for i, name in enumerate(names)}
+    shape = dict(analysis)
+    shape["functions"] = [index[name] for name in analysis["functions"]]
+    shape["variables"] = frozenset(index[name] for name in analysis["variables"])
+    shape["used_variables"] = frozenset(index[name] for name in analysis["used_variables"])
+    shape["unused_variables"] = sorted(index[name] for name in analysis["unused_variables"])
+    return shape
+
+def name_analysis(shape: dict, names: list) -> dict:
+    analysis = dict(shape)
+    analysis["functions"] = [names[i] for i in shape["functions"]]
+    analysis["variables"] = {names[i] for i in shape["variables"]}
+    analysis["used_variables"] = {names[i] for i in shape["used_variables"]}
+    analysis["unused_variables"] = [names[i] for i in shape["unused_variables"]]
+    return analysis
+
+def cached_analysis(code: str):
+    """Return ``(analysis, entry)``, reusing the analysis of same-shaped code.
+
+    ``entry`` holds the reports rendered for this shape (see
+    ``cached_report``); it is None when the code does not parse. Reruns of
+    unchanged code skip parsing through ``SOURCE_CACHE``.
+    """
+    source_key = hashlib.blake2b(code.encode("utf-8"), digest_size=16).hexdigest()
+    located = SOURCE_CACHE.get(source_key)
+    tree = None
+
+    if located is None:
+        try:
+            tree = ast.parse(code)
+        except Exception:
+            return advanced_code_analysis(code), None
+        located = SOURCE_CACHE.put(source_key, fingerprint(tree))
+
+    key, names = located
+    entry = REPORT_CACHE.get(key)
+    if entry is None:
+        if tree is None:
+            tree = ast.parse(code)
+        shape = shape_analysis(analyze_tree(tree), names)
+        entry = REPORT_CACHE.put(key, {"analysis": shape, "reports": {}})
+
+    return name_analysis(entry["analysis"], names), entry
+
+def cached_report(entry, name: str, build, analysis: dict):
+    # Reports cached here must not contain identifiers or program output
+    if entry is None:
+        return build(analysis)
+
+    reports = entry["reports"]
+    if name not in reports:
+        reports[name] = build(analysis)
+    return reports[name]
+
+def report_cache_stats(request):
+    if not request.user.is_staff:
+        return JsonResponse({"output": "Forbidden"}, status=403)
+    return JsonResponse({
+        "shapes": REPORT_CACHE.stats(),
+        "sources": SOURCE_CACHE.stats()
+    })
+
 def calculate_skill_score(analysis: dict):
     score = 0
 
@@ -609,10 +1440,59 @@ def calculate_skill_score(analysis: dict):
 
     return min(score, 100)
 
-def generate_personalized_feedback(analysis, stdout):
+def detect_level(score: int) -> str:
+    if score < 25:
+        return "Beginner"
+    if score < 60:
+        return "Intermediate"
+    return "Advanced"
+
+# Placeholders for the per-run parts of a cached feedback template
+REPORT_PROGRESS = "\0progress"
+REPORT_UNUSED = "\0unused"
+REPORT_OUTPUT = "\0output"
+
+def generate_personalized_feedback(analysis, stdout, profile=None, template=None, trend=None):
     if not analysis:
         return stdout
 
+    if template is None:
+        template = feedback_template(analysis)
+
+    response = []
+    for line in template:
+        if line == REPORT_PROGRESS:
+            response.extend(progress_lines(calculate_skill_score(analysis), profile, trend))
+        elif line == REPORT_UNUSED:
+            response.append(
+                f"⚠️ Unused variables detected: {', '.join(analysis['unused_variables'])}"
+            )
+        elif line == REPORT_OUTPUT:
+            response.append(stdout[:3000])
+        else:
+            response.append(line)
+
+    return "\n".join(response)
+
+def progress_lines(score, profile, trend=None) -> list:
+    # Progress (read from the learner's precomputed rollup); trend is the
+    # moving average from before this run
+    if profile is None or profile.runs <= 1 or trend is None:
+        return []
+
+    lines = [
+        f"📈 Progress: {profile.runs} runs, average {profile.score_avg}, "
+        f"best {profile.best_score}/100"
+    ]
+    if score > trend:
+        lines.append("⬆️ This run is above your recent average. Keep it up!")
+    elif score < trend:
+        lines.append("⬇️ This run is below your recent average.")
+    lines.append("")
+    return lines
+
+def feedback_template(analysis) -> tuple:
+    """Feedback report lines, with placeholders for the per-run parts."""
     response = []
     score = calculate_skill_score(analysis)
 
@@ -620,23 +1500,18 @@ def generate_personalized_feedback(analysis, stdout):
     response.append(f"🎯 Skill Score: {score}/100\n")
 
     # Level Detection
-    if score < 25:
-        level = "Beginner"
-    elif score < 60:
-        level = "Intermediate"
-    else:
-        level = "Advanced"
+    level = detect_level(score)
 
     response.append(f"📊 Level Detected: {level}\n")
 
+    response.append(REPORT_PROGRESS)
+
     # Structure feedback
     if not analysis["functions"]:
         response.append("💡 Tip: Use functions to modularize your logic.")
 
     if analysis["unused_variables"]:
-        response.append(
-            f"⚠️ Unused variables detected: {', '.join(analysis['unused_variables'])}"
-        )
+        response.append(REPORT_UNUSED)
 
     if analysis["nested_loop_depth"] >= 2:
         response.append("⚠️ Deep nested loops detected. Consider optimization.")
@@ -664,6 +1539,6 @@ def generate_personalized_feedback(analysis, stdout):
         response.append("- Improve time and space complexity awareness.")
 
     response.append("\n📤 Program Output:")
-    response.append(stdout[:3000])
+    response.append(REPORT_OUTPUT)
 
-    return "\n".join(response)
+    return tuple(response)
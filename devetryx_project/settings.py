@@ -74,6 +74,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Private runtime data (build cache, uploaded stdin); created with mode 0700
+DEVETRYX_DATA_DIR = BASE_DIR / 'var'
+
 # JAZZMIN_SETTINGS = {
 #     'site_title': 'Devetryx Admin',
 #     'site_header': 'devetryx',